@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of config subsystem
+
+Measure throughput of :class:`config.Config` and of each config type, without network. Results are written as JSON,
+and can be compared with a saved baseline to catch performance regressions:
+
+.. code-block:: bash
+
+    python benchmarks/config_benchmark.py --output baseline.json
+    python benchmarks/config_benchmark.py --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from config import Config, ConfigStore  # noqa: E402
+from config.config_types import Bool, Color, Dict, Float, Int, List, Str, discord_types, factory  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+
+class StubClient:
+    """Client replacement for discord types, never connected to discord"""
+
+    def __init__(self, ready=True):
+        self.ready = ready
+        self.objects = {}
+
+    def is_ready(self):
+        return self.ready
+
+    def _get(self, id_):
+        try:
+            return self.objects[id_]
+        except KeyError:
+            obj = self.objects[id_] = types.SimpleNamespace(id=id_)
+            return obj
+
+    get_channel = get_guild = get_role = get_user = _get
+
+    def warning(self, *args, **kwargs):
+        pass
+
+
+class Runner:
+    def __init__(self, repeat, name_filter=""):
+        """Run benchmarks whose name contains ``name_filter``, and collect results"""
+        self.repeat = repeat
+        self.name_filter = name_filter
+        self.results = {}
+
+    def measure(self, name, function):
+        """Record best time of one call of ``function``, in seconds"""
+        if self.name_filter not in name:
+            return
+        timer = timeit.Timer(function)
+        # Each run lasts at least 0.2s
+        number, _ = timer.autorange()
+        self.results[name] = min(timer.repeat(repeat=self.repeat, number=number)) / number
+
+
+def type_cases(sizes):
+    """Yield (name, type, value, saved value) for each config type"""
+    yield "Int", factory(Int, min=0), 42, 42
+    yield "Float", factory(Float, min=0), 4.2, 4.2
+    yield "Str", factory(Str), "value", "value"
+    yield "Bool", factory(Bool), True, True
+    yield "Color", factory(Color), 0xFF00FF, 0xFF00FF
+    for discord_type in (discord_types.Channel, discord_types.Guild, discord_types.Role, discord_types.User):
+        for ready in (False, True):
+            client = StubClient(ready)
+            state = "ready" if ready else "not_ready"
+            yield f"{discord_type.__name__}[{state}]", factory(discord_type, client), 1234, 1234
+    for size in sizes:
+        values = list(range(size))
+        yield f"List[Int][{size}]", factory(List, factory(Int, min=0)), values, values
+        yield f"Dict[Int,Float][{size}]", factory(Dict, factory(Int), factory(Float)), \
+            {i: i / 2 for i in values}, [[i, i / 2] for i in values]
+        yield f"List[Channel][{size}]", factory(List, factory(discord_types.Channel, StubClient())), values, values
+
+
+def bench_types(runner, sizes):
+    for name, type_, value, saved in type_cases(sizes):
+        instance = type_()
+        instance.set(value)
+        runner.measure(f"types.{name}.check_value", lambda: instance.check_value(value))
+        runner.measure(f"types.{name}.set", lambda: instance.set(value))
+        runner.measure(f"types.{name}.get", instance.get)
+        runner.measure(f"types.{name}.to_save", instance.to_save)
+        runner.measure(f"types.{name}.load", lambda: type_().load(saved))
+
+
+def bench_config(runner, sizes, folder):
+    for fields in (10, 100):
+        config = Config(None)
+        runner.measure(f"config.register[{fields}]",
+                       lambda: [config.register(f"field_{i}", factory(Int)) for i in range(fields)])
+    for size in sizes:
+        variants = {
+            "toml": lambda path: Config(path),
+            "toml+cache": lambda path: Config(path, binary_cache=True),
+            "sqlite": lambda path: Config(path, store=store),
+        }
+        store = ConfigStore(os.path.join(folder, f"store_{size}.sqlite3"))
+        for variant, create in variants.items():
+            path = os.path.join(folder, variant, f"config_{size}.toml")
+
+            def new_config():
+                config = create(path)
+                config.register("number", factory(Int))
+                config.register("numbers", factory(List, factory(Int)))
+                return config
+
+            config = new_config()
+            config.set({"number": 1, "numbers": list(range(size))})
+            prefix = f"config[{variant}][{size}]"
+            runner.measure(f"{prefix}.set", lambda: config.set({"number": 2}, no_save=True))
+            runner.measure(f"{prefix}.get", lambda: config["number"])
+
+            def save():
+                # Change a field, so stores don't skip write
+                config.set({"number": 3}, no_save=True)
+                config.write()
+
+            runner.measure(f"{prefix}.save", save)
+            runner.measure(f"{prefix}.load", lambda: new_config().load())
+        store.close()
+
+
+def compare(results, baseline, threshold):
+    """Print comparison with baseline, return names of regressed benchmarks"""
+    regressions = []
+    for name, value in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:60} {value * 1e6:12.3f}µs (new)")
+            continue
+        ratio = value / base if base else float("inf")
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            mark = "improvement"
+        print(f"{name:60} {value * 1e6:12.3f}µs {ratio:7.2f}x {mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark config subsystem")
+    parser.add_argument("--sizes", type=lambda s: [int(i) for i in s.split(",")], default=DEFAULT_SIZES,
+                        help="Comma separated sizes of list and dict values")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs of each benchmark, best one is kept")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare results with this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown considered as a regression (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    runner = Runner(args.repeat, args.filter)
+    bench_types(runner, args.sizes)
+    with tempfile.TemporaryDirectory() as folder:
+        bench_config(runner, args.sizes, folder)
+    results = runner.results
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "duration": time.perf_counter() - start,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}.")
+            return 1
+    elif not args.output:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
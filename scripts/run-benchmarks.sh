@@ -0,0 +1,10 @@
+#!/usr/bin/env bash
+
+# if any command inside script returns error, exit and return that error
+set -e
+
+cd "${0%/*}/.."
+
+echo "Running benchmarks"
+# Extra arguments are given to benchmark, e.g. --baseline baseline.json
+pipenv run python benchmarks/config_benchmark.py "$@"
@@ -1,20 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 import importlib
 import inspect
 import logging
 import os
 import sys
 import traceback
+import typing
 
 import discord
 import toml
 from packaging.specifiers import SpecifierSet, InvalidSpecifier
 
+from bot_base import intents
+from bot_base.coalesce import CoalescePolicy, Coalescer
+from bot_base.executor import CpuExecutor
+from bot_base.log_sink import LogSink
 from bot_base.modules import ModuleManager
-from config import Config, config_types
+from bot_base.recorder import EventRecorder
+from bot_base.stats import DispatchStats
+from bot_base.watchdog import LoopWatchdog
+from config import Config, ConfigStore, ConfigWatcher, ConfigWriter, config_types
 from config.config_types import factory
 import errors
+from utils import files
 
 __version__ = "0.2.0"
 
@@ -22,8 +32,20 @@ __version__ = "0.2.0"
 class BotBase(discord.Client):
     log = None
 
-    def __init__(self, data_folder: str = "data", modules_folder: str = "modules", *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(self, data_folder: str = "data", modules_folder: str = "modules", *args,
+                 config_save_delay: typing.Optional[float] = None, config_save_max_pending: int = 32,
+                 config_watch: bool = True, config_binary_cache: bool = False,
+                 config_store: typing.Optional[str] = None, config_shared: bool = False,
+                 module_queue_size: typing.Optional[int] = None,
+                 module_queue_workers: int = 1, module_queue_policy: str = "drop_new", dispatch_stats: bool = False,
+                 dispatch_stats_interval: typing.Optional[float] = None,
+                 dispatch_stats_file: typing.Optional[str] = None, log_buffer_size: int = 1024,
+                 log_batch_delay: float = 0.1, log_queue_size: typing.Optional[int] = 10000,
+                 cpu_workers: typing.Optional[int] = None, cpu_executor: str = "process",
+                 record_events: typing.Optional[str] = None, watchdog_threshold: typing.Optional[float] = 1.,
+                 watchdog_report_interval: float = 60.,
+                 coalesce: typing.Optional[typing.Dict[str, CoalescePolicy]] = None, **kwargs):
+        # Client is initialized once enabled modules are known, to compute intents
         # Create folders
         os.makedirs(modules_folder, exist_ok=True)
         os.makedirs(data_folder, exist_ok=True)
@@ -31,11 +53,30 @@ class BotBase(discord.Client):
         # TODO: Vérifier que ca ne casse rien
         # Setup logging
         self.log = logging.getLogger('bot_base')
+        # Log events are delivered to modules in batches, records are written in a thread once client is started
+        self.log_queue_size = log_queue_size
+        self.log_sink = LogSink(self, capacity=log_buffer_size, delay=log_batch_delay,
+                                queue_size=log_queue_size or 0)
 
         # Setup config
         self.configs = {}
+        # Write-behind engine shared by all configs, if enabled
+        self.config_writer = None
+        if config_save_delay is not None:
+            self.config_writer = ConfigWriter(delay=config_save_delay, max_pending=config_save_max_pending,
+                                              on_error=self.error)
+        # Reload configs in background when their files change, started with client
+        self.config_watcher = ConfigWatcher() if config_watch else None
+        self.config_binary_cache = config_binary_cache
+        # Config files are also written by other processes (e.g. other shards)
+        self.config_shared = config_shared
+        # Database holding configs from get_config, instead of one file per config
+        self.config_store = None
+        if config_store is not None:
+            self.config_store = ConfigStore(os.path.join(data_folder, config_store))
 
-        self.config = Config(path=os.path.join(data_folder, "config.toml"))
+        self.config = Config(path=os.path.join(data_folder, "config.toml"), writer=self.config_writer,
+                             binary_cache=config_binary_cache, shared=config_shared)
         self.config.register("data_folder", factory(config_types.Str))
 
         self.config.set({
@@ -43,18 +84,151 @@ class BotBase(discord.Client):
         }, no_save=True)
 
         self.config.load()
+        if self.config_watcher is not None:
+            self.config_watcher.watch(self.config)
+
+        # Each module handles its events in its own queue and workers, if enabled
+        queue_options = None
+        if module_queue_size is not None:
+            queue_options = {"queue_size": module_queue_size, "workers": module_queue_workers,
+                             "policy": module_queue_policy}
+        # Timing of module event handlers, dumped to log and/or file every dispatch_stats_interval seconds
+        self.dispatch_stats = DispatchStats() if dispatch_stats else None
+        self.dispatch_stats_interval = dispatch_stats_interval
+        self.dispatch_stats_file = None
+        if dispatch_stats_file is not None:
+            self.dispatch_stats_file = os.path.join(data_folder, dispatch_stats_file)
+        self.modules = ModuleManager(self, queue_options, self.dispatch_stats)
+
+        # Only subscribe to events handled by enabled modules, unless intents are given
+        if hasattr(discord, "Intents") and isinstance(kwargs.get("intents", "auto"), str):
+            kwargs["intents"] = intents.build_intents(self.modules.required_intents())
+        super().__init__(*args, **kwargs)
+
+        # Workers for CPU-bound functions of modules, created on first use, or when client starts if their number is
+        # given, then they preload enabled modules
+        self.cpu_executor = CpuExecutor(cpu_workers, kind=cpu_executor)
+        self.cpu_warm = cpu_workers is not None
+        CpuExecutor.default = self.cpu_executor
 
-        self.modules = ModuleManager(self)
+        # Dispatched events are written to this file once client is started, to be replayed offline
+        self.record_events = None
+        if record_events is not None:
+            self.record_events = os.path.join(data_folder, record_events)
+        self.recorder = None
+
+        # Report blocked event loop, with module and event being dispatched
+        self.current_dispatch = None
+        self.watchdog = None
+        if watchdog_threshold is not None:
+            self.watchdog = LoopWatchdog(self, threshold=watchdog_threshold, report_interval=watchdog_report_interval)
+
+        # Bursty events are also dispatched in batches to modules handling <event>_batch
+        self.coalescer = Coalescer(self, coalesce) if coalesce else None
+
+        # Close may be called several times (e.g. on SIGTERM, then when client stops), services are stopped once
+        self._services_closed = False
 
     async def on_ready(self):
         self.info("Bot ready.")
-        self.modules.load_modules()
+        await self.modules.load_modules()
+        self.check_intents()
+
+    def check_intents(self) -> None:
+        """
+        Warn about loaded modules which need intents that are not enabled
+        """
+        if not hasattr(discord, "Intents"):
+            return
+        for module in self.modules:
+            needed = intents.required_intents(module.events, module.infos.get("intents", ()))
+            if needed is None:
+                continue
+            missing = intents.missing_intents(self.intents, needed)
+            if missing:
+                privileged = missing & intents.PRIVILEGED_INTENTS
+                self.warning(f"Module {module.name} needs intents {', '.join(sorted(missing))} which are not enabled, "
+                             f"some of its events won't be received."
+                             + (f" Intents {', '.join(sorted(privileged))} must also be enabled in discord developer "
+                                f"portal." if privileged else ""))
 
     def dispatch(self, event, *args, **kwargs):
         """Dispatch event"""
+        if self.recorder is not None:
+            self.recorder.record(event, args, kwargs)
         super().dispatch(event, *args, **kwargs)
-        for module in self.modules:
-            module.dispatch(event, *args, **kwargs)
+        try:
+            for module in self.modules.get_handlers(event):
+                self.current_dispatch = (module.name, event)
+                module.dispatch(event, *args, **kwargs)
+        finally:
+            self.current_dispatch = None
+        if self.coalescer is not None and event in self.coalescer.policies:
+            self.coalescer.add(event, args, kwargs)
+
+    async def start(self, *args, **kwargs):
+        self.start_services()
+        await super().start(*args, **kwargs)
+
+    def start_services(self) -> None:
+        """
+        Start background services of bot (config watcher, log writer, workers...) in running event loop
+        """
+        if self.cpu_warm:
+            self.cpu_executor.preload = list(self.modules.config["enabled_modules"])
+            self.cpu_executor.start()
+        if self.log_queue_size is not None:
+            self.log_sink.start(self.log)
+        if self.watchdog is not None:
+            self.watchdog.start()
+        if self.record_events is not None and self.recorder is None:
+            self.recorder = EventRecorder(self.record_events)
+        if self.config_watcher is not None:
+            self.config_watcher.start()
+        if self.dispatch_stats is not None and self.dispatch_stats_interval is not None:
+            self.dispatch_stats.start(self.dispatch_stats_interval, log=self.info, path=self.dispatch_stats_file)
+
+    async def close(self):
+        await super().close()
+        if self._services_closed:
+            return
+        self._services_closed = True
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        if self.coalescer is not None:
+            self.coalescer.flush()
+        await self.modules.close()
+        await asyncio.get_running_loop().run_in_executor(None, self.cpu_executor.shutdown)
+        if CpuExecutor.default is self.cpu_executor:
+            CpuExecutor.default = None
+        if self.dispatch_stats is not None:
+            self.dispatch_stats.stop()
+            if self.dispatch_stats_file is not None:
+                self.dispatch_stats.dump(self.dispatch_stats_file)
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+        # Write pending config changes before exit
+        if self.config_writer is not None:
+            self.config_writer.flush()
+        await asyncio.get_running_loop().run_in_executor(None, files.deferred_sync.flush)
+        if self.config_store is not None:
+            self.config_store.close()
+        self.log_sink.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    async def run_cpu(self, func: typing.Callable, *args, **kwargs) -> typing.Any:
+        """
+        Call a CPU-bound function in a worker, without blocking event loop
+
+        With process workers (default), function and arguments must be picklable, i.e. function must be defined at
+        module level. See also :func:`bot_base.executor.cpu_bound`.
+
+        :param func: Function to call
+        :return: Result of function
+        """
+        return await self.cpu_executor.run(func, *args, **kwargs)
 
     async def on_error(self, event_method, *args, **kwargs):
         self.error(f"Error in {event_method}: \n{traceback.format_exc()}")
@@ -63,24 +237,30 @@ class BotBase(discord.Client):
     def info(self, info, *args, **kwargs):
         if self.log:
             self.log.info(info, *args, **kwargs)
-        self.dispatch("log_info", info, *args, **kwargs)
+        self.log_sink.emit("log_info", info, args, kwargs)
 
     def error(self, e, *args, **kwargs):
         if self.log:
             self.log.error(e, *args, **kwargs)
-        self.dispatch("log_error", e, *args, **kwargs)
+        self.log_sink.emit("log_error", e, args, kwargs)
 
     def warning(self, warning, *args, **kwargs):
         if self.log:
             self.log.warning(warning, *args, **kwargs)
-        self.dispatch("log_warning", warning, *args, **kwargs)
+        self.log_sink.emit("log_warning", warning, args, kwargs)
 
     # Configuration
 
     def get_config(self, path):
-        path = os.path.join(self.config["data_folder"], path)
-        config = self.configs.get(path) or Config(path=path)
-        self.configs.update({
-            path: config
-        })
+        if self.config_store is None:
+            path = os.path.join(self.config["data_folder"], path)
+        config = self.configs.get(path)
+        if config is None:
+            config = Config(path=path, writer=self.config_writer, binary_cache=self.config_binary_cache,
+                            store=self.config_store, shared=self.config_shared)
+            self.configs.update({
+                path: config
+            })
+            if self.config_watcher is not None and self.config_store is None:
+                self.config_watcher.watch(config)
         return config
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import typing
+
+if typing.TYPE_CHECKING:
+    from bot_base.bot_base import BotBase
+
+
+def first_id(*args) -> typing.Any:
+    """Default key of :class:`Latest`: id of first argument of event (e.g. member of ``voice_state_update``)"""
+    return getattr(args[0], "id", args[0]) if args else None
+
+
+def last_id(*args) -> typing.Any:
+    """Id of last argument of event (e.g. ``after`` member of ``presence_update``)"""
+    return getattr(args[-1], "id", args[-1]) if args else None
+
+
+class CoalescePolicy:
+    #: :class:`float`: Time (in seconds) events are collected before batch is dispatched
+    window: float
+
+    def __init__(self, window: float = 1.) -> None:
+        """
+        Base class of coalescing policies, which collect events of a type during a time window
+
+        :param float window: Time events are collected before batch is dispatched
+        """
+        self.window = window
+
+    def add(self, args: tuple) -> None:
+        """Collect arguments of an event"""
+        raise NotImplementedError
+
+    def drain(self) -> typing.List[tuple]:
+        """Get collected events and forget them"""
+        raise NotImplementedError
+
+
+class Batch(CoalescePolicy):
+    def __init__(self, window: float = 1.) -> None:
+        """
+        Keep all events of window
+
+        :Basic usage:
+
+        >>> policy = Batch()
+        >>> policy.add((1, 2))
+        >>> policy.add((3, 4))
+        >>> policy.drain()
+        [(1, 2), (3, 4)]
+
+        :param float window: Time events are collected before batch is dispatched
+        """
+        super().__init__(window)
+        self._events = []
+
+    def add(self, args: tuple) -> None:
+        self._events.append(args)
+
+    def drain(self) -> typing.List[tuple]:
+        events, self._events = self._events, []
+        return events
+
+
+class Latest(CoalescePolicy):
+    def __init__(self, window: float = 1., key: typing.Callable[..., typing.Hashable] = first_id) -> None:
+        """
+        Keep only latest event of each key during window
+
+        :Basic usage:
+
+        >>> policy = Latest(key=lambda user, status: user)
+        >>> policy.add(("alice", "online"))
+        >>> policy.add(("bob", "online"))
+        >>> policy.add(("alice", "idle"))
+        >>> policy.drain()
+        [('bob', 'online'), ('alice', 'idle')]
+
+        :param float window: Time events are collected before batch is dispatched
+        :param key: Function called with arguments of event, giving its key
+        """
+        super().__init__(window)
+        self.key = key
+        self._events = {}
+
+    def add(self, args: tuple) -> None:
+        key = self.key(*args)
+        # Latest events come last
+        self._events.pop(key, None)
+        self._events[key] = args
+
+    def drain(self) -> typing.List[tuple]:
+        events, self._events = self._events, {}
+        return list(events.values())
+
+
+class Sample(CoalescePolicy):
+    def __init__(self, window: float = 1., every: int = 10) -> None:
+        """
+        Keep one event out of ``every`` during window
+
+        :Basic usage:
+
+        >>> policy = Sample(every=2)
+        >>> for i in range(5):
+        ...     policy.add((i,))
+        >>> policy.drain()
+        [(0,), (2,), (4,)]
+
+        :param float window: Time events are collected before batch is dispatched
+        :param int every: Keep one event out of this number
+        """
+        super().__init__(window)
+        self.every = every
+        self._count = 0
+        self._events = []
+
+    def add(self, args: tuple) -> None:
+        if self._count % self.every == 0:
+            self._events.append(args)
+        self._count += 1
+
+    def drain(self) -> typing.List[tuple]:
+        events, self._events = self._events, []
+        return events
+
+
+def default_policies() -> typing.Dict[str, CoalescePolicy]:
+    """
+    Get policies for usual bursty events
+
+    :return: Policies by event name
+    :rtype: typing.Dict[str, CoalescePolicy]
+    """
+    return {
+        "typing": Latest(window=1., key=lambda channel, user, when: (channel.id, user.id)),
+        "presence_update": Latest(window=1., key=last_id),
+        "member_update": Latest(window=1., key=last_id),
+        "voice_state_update": Latest(window=1., key=first_id),
+    }
+
+
+class Coalescer:
+    #: :class:`typing.Dict` [:class:`str`, :class:`CoalescePolicy`]: Policy of each coalesced event
+    policies: typing.Dict[str, CoalescePolicy]
+
+    def __init__(self, client: BotBase, policies: typing.Dict[str, CoalescePolicy]) -> None:
+        """
+        Dispatch coalesced forms of events, as ``<event>_batch`` events
+
+        Events are only collected while a module explicitly handles ``<event>_batch``, and are still dispatched
+        individually to modules handling ``<event>``. Batches are lists of arguments of events. Events with keyword
+        arguments are not coalesced.
+
+        :param BotBase client: Client dispatching batches
+        :param policies: Policy of each coalesced event
+        """
+        self.client = client
+        self.policies = policies
+        self._batch_events = {event: f"{event}_batch" for event in policies}
+        self._handles = {}
+
+    def add(self, event: str, args: tuple, kwargs: typing.Dict[str, typing.Any]) -> None:
+        """
+        Collect an event if a module handles its batches
+
+        :param str event: Name of event
+        :param tuple args: Arguments of event
+        :param typing.Dict[str, typing.Any] kwargs: Keyword arguments of event
+        """
+        if kwargs:
+            return
+        handlers = self.client.modules.get_handlers(self._batch_events[event])
+        if not any(module.events is not None for module in handlers):
+            return
+        policy = self.policies[event]
+        policy.add(args)
+        if event not in self._handles:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush(event)
+                return
+            self._handles[event] = loop.call_later(policy.window, self.flush, event)
+
+    def flush(self, event: typing.Optional[str] = None) -> None:
+        """
+        Dispatch collected batches now
+
+        :param typing.Optional[str] event: Only dispatch batch of this event
+        """
+        events = self.policies if event is None else [event]
+        for event in events:
+            handle = self._handles.pop(event, None)
+            if handle is not None:
+                handle.cancel()
+            batch = self.policies[event].drain()
+            if batch:
+                self.client.dispatch(self._batch_events[event], batch)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import inspect
+import traceback
+import typing
+
+POLICIES = ("drop_new", "drop_oldest", "buffer")
+
+#: Options of queues which can be given in ``[dispatch]`` table of infos.toml
+QUEUE_OPTIONS = ("queue_size", "workers", "policy", "buffer_size")
+
+
+class ModuleQueue:
+    #: :class:`int`: Maximum number of events waiting in queue
+    size: int
+    #: :class:`int`: Number of worker tasks, i.e. events handled at the same time
+    workers: int
+    #: :class:`str`: What to do with a new event when queue is full, one of :data:`POLICIES`
+    policy: str
+    #: :class:`int`: Maximum number of events kept by ``buffer`` policy while queue is full
+    buffer_size: int
+    #: :class:`int`: Highest number of events seen waiting in queue
+    max_depth: int
+    #: :class:`int`: Number of events dropped because queue was full
+    dropped: int
+    #: :class:`int`: Number of events handled by workers
+    processed: int
+    #: :class:`int`: Number of events whose handler raised an exception
+    errors: int
+
+    def __init__(self, handler: typing.Callable, name: str = "", size: int = 1000, workers: int = 1,
+                 policy: str = "drop_new", buffer_size: typing.Optional[int] = None,
+                 on_error: typing.Optional[typing.Callable[[str], typing.Any]] = None) -> None:
+        """
+        Bounded queue of events handled by worker tasks
+
+        Events are only queued by :meth:`put`, so a slow handler delays its own queue and not the caller. When queue
+        is full, policy ``drop_new`` drops new event, ``drop_oldest`` drops oldest waiting event, and ``buffer`` keeps
+        new event in an extra buffer, moved to queue when a slot is free, up to ``buffer_size`` events, then drops new
+        events. Caller is never blocked, ``buffer`` only adds capacity which is not counted in queue depth.
+
+        Workers are started on first event, if no event loop is running events are handled immediately.
+
+        :Basic usage:
+
+        >>> queue = ModuleQueue(print, "my_module", size=10, workers=2)
+        >>> queue.put(("message", "content"), {})
+        message content
+        >>> queue.metrics()
+        {'depth': 0, 'max_depth': 0, 'buffered': 0, 'dropped': 0, 'processed': 1, 'errors': 0}
+
+        With ``buffer`` policy, buffered events are bounded too:
+
+        >>> async def burst():
+        ...     queue = ModuleQueue(print, "my_module", size=2, policy="buffer", buffer_size=1)
+        ...     for i in range(5):
+        ...         queue.put((i,), {})
+        ...     metrics = queue.metrics()
+        ...     await queue.stop()
+        ...     return metrics
+        >>> asyncio.run(burst())
+        {'depth': 2, 'max_depth': 2, 'buffered': 1, 'dropped': 2, 'processed': 0, 'errors': 0}
+
+        :param handler: Function called with each event, coroutines returned are awaited by worker
+        :param str name: Name used in error messages
+        :param int size: Maximum number of events waiting in queue
+        :param int workers: Number of worker tasks
+        :param str policy: One of ``drop_new``, ``drop_oldest`` or ``buffer``
+        :param typing.Optional[int] buffer_size: Maximum number of events kept by ``buffer`` policy while queue is
+            full, ``size`` by default
+        :param on_error: Function called with error message when handler raises an exception
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy {policy}, expected one of {', '.join(POLICIES)}.")
+        if size < 1 or workers < 1:
+            raise ValueError("Queue size and number of workers must be at least 1.")
+        if buffer_size is not None and buffer_size < 0:
+            raise ValueError("Buffer size can't be negative.")
+        self.handler = handler
+        self.name = name
+        self.size = size
+        self.workers = workers
+        self.policy = policy
+        self.buffer_size = size if buffer_size is None else buffer_size
+        self.on_error = on_error
+        self.max_depth = 0
+        self.dropped = 0
+        self.processed = 0
+        self.errors = 0
+        self._queue = collections.deque()
+        # Events kept by ``buffer`` policy while queue is full
+        self._buffer = collections.deque()
+        self._ready = None
+        self._tasks = []
+
+    @property
+    def depth(self) -> int:
+        """Number of events waiting in queue"""
+        return len(self._queue)
+
+    def metrics(self) -> typing.Dict[str, int]:
+        """
+        Get counters of queue
+
+        :return: Current depth, highest depth, and numbers of buffered, dropped, processed and failed events
+        :rtype: typing.Dict[str, int]
+        """
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "buffered": len(self._buffer),
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "errors": self.errors,
+        }
+
+    def put(self, args: tuple, kwargs: typing.Dict[str, typing.Any]) -> None:
+        """
+        Add an event to queue
+
+        :param tuple args: Positional arguments of handler
+        :param typing.Dict[str, typing.Any] kwargs: Keyword arguments of handler
+        """
+        if not self._tasks and not self.start():
+            # No loop, nothing would ever consume queue
+            self._handle_now(args, kwargs)
+            return
+        if len(self._queue) >= self.size:
+            if self.policy == "drop_new":
+                self.dropped += 1
+                return
+            if self.policy == "drop_oldest":
+                self._queue.popleft()
+                self.dropped += 1
+            elif len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+                return
+            else:
+                self._buffer.append((args, kwargs))
+                return
+        self._queue.append((args, kwargs))
+        if len(self._queue) > self.max_depth:
+            self.max_depth = len(self._queue)
+        self._ready.set()
+
+    def start(self) -> bool:
+        """
+        Start workers in running event loop
+
+        :return: False if no event loop is running
+        :rtype: bool
+        """
+        if self._tasks:
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._ready = asyncio.Event()
+        self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+        return True
+
+    async def stop(self) -> None:
+        """
+        Stop workers, events left in queue are dropped
+        """
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.dropped += len(self._queue) + len(self._buffer)
+        self._queue.clear()
+        self._buffer.clear()
+
+    async def _work(self) -> None:
+        while True:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            args, kwargs = self._queue.popleft()
+            if self._buffer:
+                self._queue.append(self._buffer.popleft())
+            try:
+                result = self.handler(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._error()
+            self.processed += 1
+            # Let other tasks run between events of a busy queue
+            await asyncio.sleep(0)
+
+    def _handle_now(self, args: tuple, kwargs: typing.Dict[str, typing.Any]) -> None:
+        try:
+            self.handler(*args, **kwargs)
+        except Exception:
+            self._error()
+        self.processed += 1
+
+    def _error(self) -> None:
+        self.errors += 1
+        if self.on_error is not None:
+            self.on_error(f"Error in queued dispatch of module {self.name}: \n{traceback.format_exc()}")
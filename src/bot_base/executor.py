@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+import typing
+
+KINDS = ("process", "thread")
+
+
+def _preload(path: typing.List[str], modules: typing.Iterable[str]) -> None:
+    """Initializer of worker processes, import modules so first calls don't pay for it"""
+    sys.path[:] = path
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # Worker must start anyway, error will be raised by calls needing this module
+            logging.getLogger("bot_base").exception(f"Unable to preload module {name} in worker.")
+
+
+def _noop() -> None:
+    pass
+
+
+def _call_by_name(module: str, qualname: str, args: tuple, kwargs: typing.Dict[str, typing.Any]) -> typing.Any:
+    """Find function decorated by :func:`cpu_bound` in worker and call it"""
+    func = importlib.import_module(module)
+    for name in qualname.split("."):
+        func = getattr(func, name)
+    func = getattr(func, "__wrapped__", func)
+    return func(*args, **kwargs)
+
+
+class CpuExecutor:
+    #: :class:`CpuExecutor`: Executor used by functions decorated by :func:`cpu_bound`
+    default: typing.Optional[CpuExecutor] = None
+
+    #: :class:`str`: ``process`` or ``thread``
+    kind: str
+    #: :class:`int`: Number of workers
+    workers: int
+
+    def __init__(self, workers: typing.Optional[int] = None, kind: str = "process",
+                 preload: typing.Iterable[str] = ()) -> None:
+        """
+        Pool of workers running CPU-bound functions outside of event loop
+
+        Process workers are started with ``spawn`` method, then import ``preload`` modules, so workers don't share
+        state of bot and first calls don't wait for imports. Functions and arguments given to process workers must be
+        picklable.
+
+        :Basic usage:
+
+        >>> executor = CpuExecutor(2, kind="thread")
+        >>> asyncio.run(executor.run(sum, [1, 2, 3]))
+        6
+        >>> executor.shutdown()
+
+        :param int workers: Number of workers, default is number of CPUs
+        :param str kind: ``process`` or ``thread``
+        :param preload: Names of modules imported by each process worker at start
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown executor kind {kind}, expected one of {', '.join(KINDS)}.")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.preload = list(preload)
+        self._executor = None
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        """Underlying executor, created on first use"""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_preload,
+                    initargs=(list(sys.path), self.preload))
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(self.workers,
+                                                                       thread_name_prefix="bot_base_cpu")
+        return self._executor
+
+    def start(self) -> None:
+        """
+        Start all workers now, instead of on first calls
+        """
+        for _ in range(self.workers):
+            self.executor.submit(_noop)
+
+    async def run(self, func: typing.Callable, *args, **kwargs) -> typing.Any:
+        """
+        Call ``func`` in a worker and wait for its result
+
+        :param func: Function to call
+        :return: Result of function
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop workers, pending calls are cancelled
+
+        :param bool wait: Wait for running calls to finish
+        """
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        if sys.version_info >= (3, 9):
+            executor.shutdown(wait=wait, cancel_futures=True)
+        else:
+            executor.shutdown(wait=wait)
+
+
+def cpu_bound(func: typing.Callable) -> typing.Callable[..., typing.Awaitable]:
+    """
+    Make a module level function run in workers of :attr:`CpuExecutor.default`
+
+    Decorated function is a coroutine function. Process workers find original function by its module and name, so it
+    doesn't need to be picklable itself. Without default executor, function runs in default executor of event loop.
+
+    :Basic usage:
+
+    >>> @cpu_bound
+    ... def add(a, b):
+    ...     return a + b
+    >>> asyncio.run(add(1, 2))
+    3
+
+    :param func: Module level function
+    :return: Coroutine function
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        executor = CpuExecutor.default
+        if executor is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+        if executor.kind == "process":
+            return await executor.run(_call_by_name, func.__module__, func.__qualname__, args, kwargs)
+        return await executor.run(func, *args, **kwargs)
+
+    return wrapper
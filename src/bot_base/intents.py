@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import typing
+
+import discord
+
+#: Intents always needed to keep guilds and channels in cache
+BASE_INTENTS = ("guilds",)
+
+#: Intents needed by each event, several names are alternatives used by different discord.py versions
+EVENT_INTENTS = {
+    "member_join": ("members",),
+    "member_remove": ("members",),
+    "member_update": ("members",),
+    "raw_member_remove": ("members",),
+    "user_update": ("members",),
+    "member_ban": ("moderation", "bans"),
+    "member_unban": ("moderation", "bans"),
+    "audit_log_entry_create": ("moderation",),
+    "guild_emojis_update": ("emojis_and_stickers", "emojis"),
+    "guild_stickers_update": ("emojis_and_stickers",),
+    "guild_integrations_update": ("integrations",),
+    "integration_create": ("integrations",),
+    "integration_update": ("integrations",),
+    "raw_integration_delete": ("integrations",),
+    "webhooks_update": ("webhooks",),
+    "invite_create": ("invites",),
+    "invite_delete": ("invites",),
+    "voice_state_update": ("voice_states",),
+    "presence_update": ("presences",),
+    "message": ("messages",),
+    "message_edit": ("messages",),
+    "message_delete": ("messages",),
+    "bulk_message_delete": ("messages",),
+    "raw_message_edit": ("messages",),
+    "raw_message_delete": ("messages",),
+    "raw_bulk_message_delete": ("messages",),
+    "reaction_add": ("reactions",),
+    "reaction_remove": ("reactions",),
+    "reaction_clear": ("reactions",),
+    "reaction_clear_emoji": ("reactions",),
+    "raw_reaction_add": ("reactions",),
+    "raw_reaction_remove": ("reactions",),
+    "raw_reaction_clear": ("reactions",),
+    "raw_reaction_clear_emoji": ("reactions",),
+    "typing": ("typing",),
+    "raw_typing": ("typing",),
+    "scheduled_event_create": ("guild_scheduled_events",),
+    "scheduled_event_update": ("guild_scheduled_events",),
+    "scheduled_event_delete": ("guild_scheduled_events",),
+    "scheduled_event_user_add": ("guild_scheduled_events",),
+    "scheduled_event_user_remove": ("guild_scheduled_events",),
+    "automod_rule_create": ("auto_moderation_configuration",),
+    "automod_rule_update": ("auto_moderation_configuration",),
+    "automod_rule_delete": ("auto_moderation_configuration",),
+    "automod_action": ("auto_moderation_execution",),
+}
+
+#: Intents which must also be enabled in discord developer portal
+PRIVILEGED_INTENTS = frozenset(("members", "presences", "message_content"))
+
+
+def _resolve(alternatives: typing.Iterable[str]) -> typing.Optional[str]:
+    """Get first intent name supported by installed discord.py"""
+    for name in alternatives:
+        if name in discord.Intents.VALID_FLAGS:
+            return name
+    return None
+
+
+def _unbatched(event: str) -> str:
+    """Get event coalesced in batches of ``event``"""
+    if event.endswith("_batch") and event[:-len("_batch")] in EVENT_INTENTS:
+        return event[:-len("_batch")]
+    return event
+
+
+def required_intents(events: typing.Optional[typing.Iterable[str]],
+                     declared: typing.Iterable[str] = ()) -> typing.Optional[typing.Set[str]]:
+    """
+    Get intents needed to receive ``events``
+
+    Batched events (``<event>_batch``, see :mod:`bot_base.coalesce`) need intents of their event.
+
+    :Basic usage:
+
+    >>> sorted(required_intents(["message", "reaction_add", "ready"]))
+    ['guilds', 'messages', 'reactions']
+    >>> sorted(required_intents(["ready"], declared=["message_content"]))
+    ['guilds', 'message_content']
+    >>> sorted(required_intents(["presence_update_batch"]))
+    ['guilds', 'presences']
+    >>> required_intents(None) is None
+    True
+
+    :param events: Names of handled events, None if any event may be handled
+    :param declared: Intents explicitly needed (e.g. ``message_content``)
+    :return: Intent names, None if all default intents are needed
+    :rtype: typing.Optional[typing.Set[str]]
+    """
+    if events is None:
+        return None
+    names = set()
+    for alternatives in [BASE_INTENTS, *(EVENT_INTENTS.get(_unbatched(event), ()) for event in events),
+                         *((name,) for name in declared)]:
+        name = _resolve(alternatives)
+        if name is not None:
+            names.add(name)
+    return names
+
+
+def build_intents(names: typing.Optional[typing.Iterable[str]]) -> discord.Intents:
+    """
+    Build intents with only ``names`` enabled
+
+    :Basic usage:
+
+    >>> intents = build_intents(["guilds", "messages"])
+    >>> intents.guilds, intents.messages, intents.typing
+    (True, True, False)
+
+    :param names: Intent names, None for default intents
+    :return: Intents
+    :rtype: discord.Intents
+    """
+    if names is None:
+        return discord.Intents.default()
+    return discord.Intents(**{name: True for name in names})
+
+
+def missing_intents(intents: discord.Intents, names: typing.Iterable[str]) -> typing.Set[str]:
+    """
+    Get intents of ``names`` which are not enabled
+
+    :Basic usage:
+
+    >>> sorted(missing_intents(build_intents(["guilds"]), ["guilds", "typing"]))
+    ['typing']
+
+    :param discord.Intents intents: Enabled intents
+    :param names: Needed intent names
+    :return: Intent names which are not enabled
+    :rtype: typing.Set[str]
+    """
+    return {name for name in names if not getattr(intents, name, True)}
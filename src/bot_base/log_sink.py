@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import logging.handlers
+import queue
+import typing
+
+if typing.TYPE_CHECKING:
+    from bot_base.bot_base import BotBase
+
+#: :class:`typing.Tuple` [:class:`str`, ...]: Events built from log calls of client
+LOG_EVENTS = ("log_info", "log_warning", "log_error")
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler dropping records when queue is full, instead of blocking logger"""
+
+    def __init__(self, queue_: queue.Queue) -> None:
+        super().__init__(queue_)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _ParentHandler(logging.Handler):
+    """Send records to handlers of parent loggers, from listener thread"""
+
+    def __init__(self, logger: logging.Logger) -> None:
+        super().__init__()
+        self.logger = logger
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.logger.parent is not None:
+            self.logger.parent.handle(record)
+
+
+class LogSink:
+    #: :class:`int`: Maximum number of log events waiting for delivery to modules, oldest ones are dropped
+    capacity: int
+    #: :class:`float`: Time (in seconds) log events are collected before being delivered to modules
+    delay: float
+    #: :class:`int`: Number of log events dropped because buffer was full
+    dropped: int
+
+    def __init__(self, client: BotBase, capacity: int = 1024, delay: float = 0.1, queue_size: int = 10000) -> None:
+        """
+        Deliver log events of client to modules in batches, and write log records in a background thread
+
+        Log events are kept in a ring buffer, and delivered every ``delay`` seconds, only to modules handling them.
+        Each batch is also delivered as a list of ``(event, message, args, kwargs)`` to modules handling
+        ``log_batch`` event. If no event loop is running, log events are delivered immediately.
+
+        Once :meth:`start` is called, records of client logger are queued, and formatted records are written by a
+        :class:`logging.handlers.QueueListener` thread using handlers of parent loggers.
+
+        :Basic usage:
+
+        >>> import types
+        >>> received = []
+        >>> module = types.SimpleNamespace(dispatch=lambda event, *args: received.append((event, *args)))
+        >>> handlers = {"log_info": (module,), "log_batch": (module,)}
+        >>> client = types.SimpleNamespace(modules=types.SimpleNamespace(get_handlers=lambda e: handlers.get(e, ())))
+        >>> sink = LogSink(client, capacity=3, delay=0.01)
+        >>> async def log():
+        ...     for i in range(3):
+        ...         sink.emit("log_info", f"info {i}", (), {})
+        ...     sink.emit("log_warning", "warning", (), {})
+        ...     await asyncio.sleep(0.05)
+        >>> asyncio.run(log())
+        >>> sink.dropped
+        1
+        >>> received[:2]
+        [('log_info', 'info 1'), ('log_info', 'info 2')]
+        >>> event, batch = received[2]
+        >>> event, [(name, message) for name, message, args, kwargs in batch]
+        ('log_batch', [('log_info', 'info 1'), ('log_info', 'info 2'), ('log_warning', 'warning')])
+
+        Log events nobody handles are not kept:
+
+        >>> handlers.clear()
+        >>> sink.emit("log_info", "ignored", (), {})
+        >>> len(received)
+        3
+
+        :param BotBase client: Client whose modules receive log events
+        :param int capacity: Maximum number of log events waiting for delivery
+        :param float delay: Time log events are collected before being delivered
+        :param int queue_size: Maximum number of log records waiting to be written
+        """
+        self.client = client
+        self.capacity = capacity
+        self.delay = delay
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._buffer = collections.deque(maxlen=capacity)
+        self._handle = None
+        self._logger = None
+        self._handler = None
+        self._listener = None
+
+    @property
+    def records_dropped(self) -> int:
+        """Number of log records dropped because writer thread was late"""
+        return self._handler.dropped if self._handler is not None else 0
+
+    def emit(self, event: str, message: typing.Any, args: tuple, kwargs: typing.Dict[str, typing.Any]) -> None:
+        """
+        Add a log event to buffer
+
+        :param str event: Name of event, one of :data:`LOG_EVENTS`
+        :param message: Logged message
+        :param tuple args: Arguments of log call
+        :param typing.Dict[str, typing.Any] kwargs: Keyword arguments of log call
+        """
+        modules = self.client.modules
+        if not modules.get_handlers(event) and not modules.get_handlers("log_batch"):
+            # Nobody listens, don't keep it
+            return
+        if len(self._buffer) == self.capacity:
+            self.dropped += 1
+        self._buffer.append((event, message, args, kwargs))
+        if self._handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+                return
+            self._handle = loop.call_later(self.delay, self.flush)
+
+    def flush(self) -> None:
+        """
+        Deliver buffered log events to modules now
+        """
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._buffer:
+            return
+        batch = list(self._buffer)
+        self._buffer.clear()
+        modules = self.client.modules
+        for event, message, args, kwargs in batch:
+            for module in modules.get_handlers(event):
+                module.dispatch(event, message, *args, **kwargs)
+        for module in modules.get_handlers("log_batch"):
+            module.dispatch("log_batch", batch)
+
+    def start(self, logger: logging.Logger) -> None:
+        """
+        Write records of ``logger`` in a background thread
+
+        Records are not propagated by ``logger`` anymore until :meth:`stop` is called, listener thread gives them to
+        handlers of parent loggers instead.
+
+        :Basic usage:
+
+        >>> written = []
+        >>> class Collect(logging.Handler):
+        ...     def emit(self, record):
+        ...         written.append(record.getMessage())
+        >>> logging.getLogger("doctest_log_sink").addHandler(Collect())
+        >>> logger = logging.getLogger("doctest_log_sink.client")
+        >>> sink = LogSink(None)
+        >>> sink.start(logger)
+        >>> logger.propagate
+        False
+        >>> logger.warning("written in thread")
+        >>> sink.stop()
+        >>> logger.propagate, written, sink.records_dropped
+        (True, ['written in thread'], 0)
+
+        :param logging.Logger logger: Logger of client
+        """
+        if self._listener is not None:
+            return
+        records = queue.Queue(self.queue_size)
+        self._logger = logger
+        self._handler = _DroppingQueueHandler(records)
+        self._listener = logging.handlers.QueueListener(records, _ParentHandler(logger))
+        self._listener.start()
+        logger.addHandler(self._handler)
+        logger.propagate = False
+
+    def stop(self) -> None:
+        """
+        Deliver remaining log events, write remaining records and stop background thread
+        """
+        self.flush()
+        if self._listener is None:
+            return
+        self._logger.removeHandler(self._handler)
+        self._logger.propagate = True
+        self._listener.stop()
+        self._listener = None
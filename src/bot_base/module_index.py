@@ -0,0 +1,129 @@
+import functools
+import json
+import os
+import typing
+
+import toml
+from packaging.specifiers import SpecifierSet
+
+from utils import files
+
+
+class ModuleIndex:
+    #: :class:`int`: Format version of index file, index files of other versions are ignored
+    VERSION = 1
+
+    #: :class:`typing.Optional` [:class:`str`]: Path of index file, None to keep index in memory
+    path: typing.Optional[str]
+    #: :class:`typing.Dict` [:class:`str`, :class:`dict`]: Parsed metadata, by absolute path of module folder
+    entries: typing.Dict[str, dict]
+
+    def __init__(self, path: typing.Optional[str]) -> None:
+        """
+        Cache of parsed ``infos.toml`` of modules, keyed by modification time and size of files
+
+        A boot with unchanged modules only stats one file per module, changed modules are parsed again.
+
+        :Basic usage:
+
+        >>> index = ModuleIndex(None)
+        >>> index.infos("doctest_missing_module") is None
+        True
+        >>> ModuleIndex.specifier(">=1.0") is ModuleIndex.specifier(">=1.0")
+        True
+
+        :param typing.Optional[str] path: Path of index file, None to keep index in memory
+        """
+        self.path = path
+        self.entries = {}
+        self._dirty = False
+        if path is not None:
+            try:
+                with open(path) as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                data = {}
+            if data.get("version") == self.VERSION:
+                self.entries = data.get("modules", {})
+
+    def _entry(self, folder: str) -> typing.Optional[dict]:
+        folder = os.path.abspath(folder)
+        try:
+            stat = os.stat(os.path.join(folder, "infos.toml"))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        key = [stat.st_mtime_ns, stat.st_size]
+        entry = self.entries.get(folder)
+        if entry is None or entry["key"] != key:
+            with open(os.path.join(folder, "infos.toml")) as file:
+                entry = {"key": key, "infos": toml.load(file)}
+            self.entries[folder] = entry
+            self._dirty = True
+        return entry
+
+    def infos(self, folder: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Get content of ``infos.toml`` of a module
+
+        :param str folder: Folder of module
+        :return: Parsed infos, None if module or infos.toml doesn't exist
+        :rtype: typing.Optional[typing.Dict[str, typing.Any]]
+        """
+        entry = self._entry(folder)
+        return entry["infos"] if entry is not None else None
+
+    def is_compatible(self, folder: str, bot_version: str) -> bool:
+        """
+        Check if module is compatible with bot version, result is cached with infos
+
+        :Basic usage:
+
+        >>> ModuleIndex(None).is_compatible("modules/doctest_missing_module", "0.2.0")
+        False
+
+        :param str folder: Folder of module
+        :param str bot_version: Version of bot
+        :return: True if ``bot_version`` of infos.toml contains ``bot_version`` or is missing, False if module has no
+            infos.toml
+        :rtype: bool
+        """
+        entry = self._entry(folder)
+        if entry is None:
+            return False
+        compatible = entry.get("compatible")
+        if compatible is None or compatible[0] != bot_version:
+            specifier = self.specifier(entry["infos"].get("bot_version", ""))
+            compatible = entry["compatible"] = [bot_version, bot_version in specifier]
+            self._dirty = True
+        return compatible[1]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def specifier(version: str) -> SpecifierSet:
+        """
+        Parse a version specifier, parsed specifiers are shared
+
+        :param str version: Version specifier, e.g. ``~=1.2``
+        :raise packaging.specifiers.InvalidSpecifier: if specifier is invalid
+        :return: Parsed specifier
+        :rtype: SpecifierSet
+        """
+        return SpecifierSet(version)
+
+    def save(self) -> None:
+        """
+        Write index file if it changed
+        """
+        if self.path is None or not self._dirty:
+            return
+        # Infos containing values unsupported by JSON (e.g. TOML dates) are parsed on each boot
+        entries = {}
+        for folder, entry in self.entries.items():
+            try:
+                json.dumps(entry)
+            except (TypeError, ValueError):
+                continue
+            entries[folder] = entry
+        # Index can be rebuilt, no need to sync it
+        files.atomic_write({self.path: json.dumps({"version": self.VERSION, "modules": entries})}, fsync=False)
+        self._dirty = False
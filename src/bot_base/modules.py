@@ -1,10 +1,17 @@
+import asyncio
+import concurrent.futures
 import importlib
+import inspect
 import os
 import sys
+import traceback
 
-import toml
-from packaging.specifiers import SpecifierSet
 import errors
+from bot_base import intents
+from bot_base.dispatch import QUEUE_OPTIONS, ModuleQueue
+from bot_base.module_index import ModuleIndex
+from bot_base.resolver import Resolver
+from bot_base.stats import DispatchStats
 from config import config_types
 from config.base import BaseType
 from config.config_types import factory
@@ -20,25 +27,83 @@ class Dependency:
         self.version = version
 
 
+def _find_cycle(graph: typing.Dict[str, typing.Set[str]]) -> typing.List[str]:
+    """
+    Find a cycle in a graph where each node has at least one successor
+
+    :Basic usage:
+
+    >>> _find_cycle({"a": {"b"}, "b": {"c"}, "c": {"a"}})
+    ['a', 'b', 'c', 'a']
+
+    :param graph: Successors of each node
+    :return: Nodes of cycle, first node is repeated at end
+    :rtype: typing.List[str]
+    """
+    path = []
+    seen = {}
+    node = min(graph)
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = min(graph[node])
+    return path[seen[node]:] + [node]
+
+
 class Module:
-    def __init__(self, module_manager, name):
+    def __init__(self, module_manager, name, folder: typing.Optional[str] = None):
         self.name = name
         self.module_manager = module_manager
         self.__infos = None
-        self.__path = os.path.join(self.module_manager.config["modules_folder"], name)
+        self.__path = folder or os.path.join(self.module_manager.config["modules_folder"], name)
 
         self.__module = None
         self.__class = None
         self.__dispatch = lambda *x, **y: None
+        self.__events = None
+        #: :class:`ModuleQueue`: Queue of events handled by workers, None if events are handled inline
+        self.queue = None
+        # Events received by a lazy module before it is activated
+        self.__pending = []
+        self.__activation = None
+        # State of previous instance given to lazy module when it is activated
+        self.__state = None
 
     def dispatch(self, *args, **kwargs):
+        if self.queue is not None:
+            return self.queue.put(args, kwargs)
         return self.__dispatch(*args, **kwargs)
 
+    @property
+    def loaded(self) -> bool:
+        """Check if module is imported (always False for lazy modules which are not activated yet)"""
+        return self.__module is not None
+
+    @property
+    def lazy(self) -> bool:
+        """Check if module asks to be imported on first handled event, only possible if it declares its events"""
+        events = self.infos.get("events")
+        return bool(self.infos.get("lazy", False)) and not self.is_metamodule and events is not None \
+            and events != "*"
+
     @property
     def version(self):
         """Get version of module"""
         return self.infos.get("version")
 
+    @property
+    def folder(self) -> str:
+        """Folder of module, default version is in modules folder, other versions in ``.versions`` subfolder"""
+        return self.__path
+
+    @property
+    def import_path(self) -> typing.Optional[str]:
+        """Folder to add to :data:`sys.path` to import this version of module, None for default version"""
+        parent = os.path.abspath(os.path.dirname(self.__path))
+        if parent == os.path.abspath(self.module_manager.config["modules_folder"]):
+            return None
+        return parent
+
     @property
     def exists(self):
         """Check if module exists"""
@@ -53,11 +118,15 @@ class Module:
 
     @property
     def infos(self):
-        if not self.has_infos:
-            raise errors.IncompatibleModuleError(f"Module {self.name} doesn't have infos.toml.")
-        if not self.__infos:
-            with open(os.path.join(self.__path, "infos.toml")) as f:
-                self.__infos = toml.load(f)
+        if self.__infos is None:
+            # Only parsed if infos.toml changed since last boot
+            infos = self.module_manager.index.infos(self.__path)
+            if infos is None:
+                if not self.has_infos:
+                    raise errors.IncompatibleModuleError(f"Module {self.name} doesn't have infos.toml.")
+                # Created meanwhile
+                infos = self.module_manager.index.infos(self.__path)
+            self.__infos = infos
         return self.__infos
 
     @property
@@ -71,19 +140,42 @@ class Module:
     @property
     def is_compatible_with_client(self):
         """Check if module is compatible with bot version"""
-        bot_version_specifier = SpecifierSet(self.infos["bot_version"])
-        return __version__ in bot_version_specifier
+        return self.module_manager.index.is_compatible(self.__path, __version__)
 
     @property
     def is_metamodule(self):
         """Check if module is metamodule"""
         return self.infos.get("metamodule", False)
 
+    @property
+    def events(self) -> typing.Optional[typing.FrozenSet[str]]:
+        """
+        Events handled by module, None if module handles all events
+
+        Events are read from ``events`` in infos.toml, or ``__events__`` attribute of main class (``"*"`` for all
+        events), else from names of ``on_<event>`` methods of main class.
+        """
+        return self.__events
+
+    def _find_events(self) -> typing.Optional[typing.FrozenSet[str]]:
+        events = self.infos.get("events")
+        if events is None:
+            events = getattr(self.__class, "__events__", None)
+        if events is None:
+            events = [name[3:] for name in dir(self.__class)
+                      if name.startswith("on_") and callable(getattr(self.__class, name, None))]
+            if not events:
+                # Nothing declared, module may handle anything in __dispatch__
+                return None
+        if events == "*":
+            return None
+        return frozenset(events)
+
     @property
     def deps(self):
         deps = []
         for dep, version in self.infos.get("dependencies", dict()).items():
-            deps.append(Dependency(dep, SpecifierSet(version)))
+            deps.append(Dependency(dep, ModuleIndex.specifier(version)))
         return deps
 
     def load(self):
@@ -95,13 +187,201 @@ class Module:
             except TypeError:
                 self.__class = self.__module.__main_class__()
             self.__dispatch = self.__class.__dispatch__
+            self.__events = self._find_events()
+            self.queue = self._create_queue()
+            stats = self.module_manager.stats
+            if stats is not None:
+                # Queue workers await returned awaitables, inline dispatch doesn't
+                if self.queue is not None:
+                    self.queue.handler = stats.wrap(self.name, self.queue.handler, awaited=True)
+                else:
+                    self.__dispatch = stats.wrap(self.name, self.__dispatch)
+
+    def load_lazy(self, state: typing.Any = None) -> None:
+        """
+        Subscribe module to events declared in infos.toml, module is imported on first of these events
+
+        Events received until module is imported and set up are buffered, then dispatched in order. If module can't be
+        activated, its events are dropped. ``state`` is given to new instance when module is activated, before its
+        ``__setup__`` method is called.
+
+        :Basic usage:
+
+        >>> import shutil, tempfile, types
+        >>> from config import Config
+        >>> folder = tempfile.mkdtemp()
+        >>> body = "async def __setup__(self): print('setup')\\n    def __dispatch__(self, *args): print(*args)\\n"
+        >>> sources = {"doctest_lazy": body, "doctest_lazy_now": body,
+        ...            "doctest_lazy_broken": "pass\\nraise RuntimeError('broken')\\n"}
+        >>> for name, body in sources.items():
+        ...     os.mkdir(os.path.join(folder, name))
+        ...     with open(os.path.join(folder, name, "infos.toml"), "w") as file:
+        ...         _ = file.write('version = "1.0.0"\\nbot_version = "~=0.2.0"\\n'
+        ...                        'events = ["message"]\\nlazy = true\\n')
+        ...     with open(os.path.join(folder, name, "__init__.py"), "w") as file:
+        ...         _ = file.write(f"class Main:\\n    {body}\\n__main_class__ = Main\\n")
+        >>> sys.path.insert(0, folder)
+        >>> client = types.SimpleNamespace(config={"data_folder": folder}, get_config=lambda name: Config(None),
+        ...                                info=print, error=lambda message: print(message.split(":")[0]))
+        >>> manager = ModuleManager(client)
+        >>> manager.config.set({"modules_folder": folder, "enabled_modules": list(sources)}, no_save=True)
+        >>> async def main():
+        ...     await manager.load_modules()
+        ...     print([(module.name, module.loaded) for module in manager.get_handlers("message")])
+        ...     manager.modules["doctest_lazy"].dispatch("message", 1)
+        ...     manager.modules["doctest_lazy"].dispatch("message", 2)
+        ...     await asyncio.sleep(0.1)
+        ...     manager.modules["doctest_lazy_broken"].dispatch("message", 3)
+        ...     await asyncio.sleep(0.1)
+        >>> asyncio.run(main())
+        [('doctest_lazy', False), ('doctest_lazy_broken', False), ('doctest_lazy_now', False)]
+        setup
+        Module doctest_lazy activated.
+        message 1
+        message 2
+        Unable to activate module doctest_lazy_broken, its events are dropped
+        >>> manager.modules["doctest_lazy_broken"].dispatch("message", 4)
+
+        Without running event loop, module is activated immediately:
+
+        >>> manager.modules["doctest_lazy_now"].dispatch("message", 5)
+        setup
+        Module doctest_lazy_now activated.
+        message 5
+        >>> sys.path.remove(folder)
+        >>> shutil.rmtree(folder)
+
+        :param state: State returned by :meth:`unload` of previous instance
+        """
+        self.__events = frozenset(self.infos["events"])
+        self.__dispatch = self.__buffer
+        self.__state = state
+
+    def __buffer(self, *args, **kwargs):
+        self.__pending.append((args, kwargs))
+        if self.__activation is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop to import in background, activate now
+            asyncio.run(self.activate())
+            return
+        self.__activation = loop.create_task(self.activate())
+
+    async def activate(self) -> None:
+        """
+        Import lazy module, then dispatch events received meanwhile
+        """
+        client = self.module_manager.client
+        if self.__activation is None:
+            # Activated without background task, events received meanwhile are only buffered
+            self.__activation = asyncio.current_task()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, importlib.import_module, self.name)
+            self.load()
+            state, self.__state = self.__state, None
+            self.restore(state)
+            # Keep buffering events until module is set up
+            dispatch, queue = self.__dispatch, self.queue
+            self.__dispatch, self.queue = self.__buffer, None
+            await self.setup()
+            self.__dispatch, self.queue = dispatch, queue
+        except Exception:
+            client.error(f"Unable to activate module {self.name}, its events are dropped: \n{traceback.format_exc()}")
+            self.__dispatch = lambda *x, **y: None
+            self.__pending = []
+            return
+        client.info(f"Module {self.name} activated.")
+        self.__flush()
+
+    def __flush(self) -> None:
+        pending, self.__pending = self.__pending, []
+        for args, kwargs in pending:
+            self.dispatch(*args, **kwargs)
+
+    async def unload(self) -> typing.Any:
+        """
+        Stop module and tear down its instance
+
+        :return: State of instance, from ``__getstate__`` method of main class, None if it doesn't define one
+        """
+        if self.__activation is not None and not self.__activation.done():
+            self.__activation.cancel()
+        self.__activation = None
+        self.__pending = []
+        if self.queue is not None:
+            await self.queue.stop()
+            self.queue = None
+        instance, self.__class = self.__class, None
+        self.__module = None
+        self.__dispatch = lambda *x, **y: None
+        if instance is None:
+            return None
+        state = None
+        getstate = getattr(type(instance), "__getstate__", None)
+        # Default __getstate__ of object (Python 3.11+) would give attributes of torn down instance
+        if getstate is not None and getstate is not getattr(object, "__getstate__", None):
+            state = getstate(instance)
+        teardown = getattr(instance, "__teardown__", None)
+        if teardown is not None:
+            result = teardown()
+            if inspect.isawaitable(result):
+                await result
+        return state
+
+    def restore(self, state: typing.Any) -> None:
+        """
+        Give state of previous instance to ``__setstate__`` method of main class, if both exist
+
+        :param state: State returned by :meth:`unload`
+        """
+        setstate = getattr(self.__class, "__setstate__", None)
+        if state is not None and setstate is not None:
+            setstate(state)
+
+    async def setup(self) -> None:
+        """
+        Call ``__setup__`` method of main class, if any, and wait for it if it is a coroutine
+        """
+        setup = getattr(self.__class, "__setup__", None)
+        if setup is not None:
+            result = setup()
+            if inspect.isawaitable(result):
+                await result
+
+    def _create_queue(self) -> typing.Optional[ModuleQueue]:
+        # Options of manager, overridden by [dispatch] table of infos.toml
+        options = dict(self.module_manager.queue_options or {})
+        declared = self.infos.get("dispatch", {})
+        unknown = declared.keys() - set(QUEUE_OPTIONS)
+        if unknown:
+            self.module_manager.client.warning(f"Unknown [dispatch] options of module {self.name} are ignored: "
+                                               f"{', '.join(sorted(unknown))}.")
+        options.update({key: value for key, value in declared.items() if key not in unknown})
+        size = options.pop("queue_size", None)
+        if not size:
+            return None
+        return ModuleQueue(self.__dispatch, self.name, size=size, on_error=self.module_manager.client.error,
+                           **options)
 
 
 class ModuleManager:
-    def __init__(self, client):
+    #: :class:`int`: Number of threads importing modules concurrently
+    import_workers: int = 8
+
+    def __init__(self, client, queue_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+                 stats: typing.Optional[DispatchStats] = None):
         self.client = client
+        #: :class:`typing.Dict` [:class:`str`, :class:`typing.Any`]: Default ``queue_size``, ``workers`` and
+        #: ``policy`` of module queues, None to dispatch events inline
+        self.queue_options = queue_options
+        #: :class:`DispatchStats`: Timing of event handlers of modules, None if disabled
+        self.stats = stats
         self.modules = dict()
         self.dispatch_modules = dict()
+        # Modules handling each event, built on first dispatch of event
+        self.handlers = dict()
 
         self.config = self.client.get_config("modules.toml")
         self.config.register("modules_folder", factory(config_types.Str))
@@ -113,27 +393,434 @@ class ModuleManager:
         }, no_save=True)
         self.config.load()
         sys.path.insert(0, self.config["modules_folder"])
+        #: :class:`ModuleIndex`: Parsed infos.toml of modules, kept between boots
+        self.index = ModuleIndex(os.path.join(self.client.config["data_folder"], "module_index.json"))
 
-    def load_module(self, name, version=None):
-        if name in self.modules.keys():
-            return
-        new_module = Module(self, name)
-        if version is not None and new_module.version not in version:
-            raise errors.MissingDependency(f"Incompatible version for dependency {name}: {new_module.version}, require {version}.")
-        for dep in new_module.deps:
-            self.load_module(dep.name, version=dep.version)
-        new_module.load()
-        self.modules.update({name: new_module})
-        if not new_module.is_metamodule:
-            self.dispatch_modules.update({name: new_module})
-            return
-        if version is None and name not in self.modules["enabled_modules"]:
+    def load_module(self, name: str, version: typing.Optional[str] = None) -> None:
+        """
+        Load a module and its missing dependencies now, and enable it
+
+        Modules are imported in calling thread and their ``__setup__`` methods are run to completion, level by level.
+        This can't be done while an event loop is running, use :meth:`load_module_async` there.
+
+        :param str name: Name of module
+        :param typing.Optional[str] version: Required version of module, e.g. ``~=1.2``
+        :raise RuntimeError: if an event loop is running in calling thread
+        :raise errors.MissingDependency: if no version of module and its dependencies satisfies all constraints
+        :raise errors.DependencyCycle: if modules depend on each other
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(f"Unable to load module {name} while event loop is running, "
+                               f"use await load_module_async({name!r}) instead.")
+        if name not in self.modules:
+            levels = self.resolve([name], {name: str(version)} if version is not None else None)
+            required = self._required(levels)
+            for level in levels:
+                for module in level:
+                    self._add_import_path(module)
+                    if module.lazy and module.name not in required:
+                        module.load_lazy()
+                        self._register(module)
+                        continue
+                    module.load()
+                    # Module is only registered once set up
+                    asyncio.run(module.setup())
+                    self._register(module)
+            self.index.save()
+        self._enable(name)
+
+    async def load_module_async(self, name: str, version: typing.Optional[str] = None) -> None:
+        """
+        Load a module and its missing dependencies, and enable it
+
+        Like :meth:`load_modules`, modules are imported in threads and their ``__setup__`` methods are awaited.
+
+        :param str name: Name of module
+        :param typing.Optional[str] version: Required version of module, e.g. ``~=1.2``
+        :raise errors.MissingDependency: if no version of module and its dependencies satisfies all constraints
+        :raise errors.DependencyCycle: if modules depend on each other
+        """
+        if name not in self.modules:
+            await self._load_levels(self.resolve([name], {name: str(version)} if version is not None else None))
+        self._enable(name)
+
+    def _enable(self, name: str) -> None:
+        if name not in self.config["enabled_modules"]:
             self.config.set({"enabled_modules": self.config["enabled_modules"] + [name]})
-            self.config.save()
 
-    def load_modules(self):
-        for module in self.config["enabled_modules"]:
-            self.load_module(module)
+    def _register(self, module: Module) -> bool:
+        """Add loaded module, return True if it handles events"""
+        self.modules.update({module.name: module})
+        if module.is_metamodule:
+            return False
+        self.dispatch_modules.update({module.name: module})
+        self.handlers.clear()
+        return True
+
+    def resolve(self, names: typing.Iterable[str],
+                required: typing.Optional[typing.Dict[str, str]] = None) -> typing.List[typing.List[Module]]:
+        """
+        Choose versions of modules and their dependencies, and sort them in levels
+
+        Versions are chosen by :class:`Resolver`, among all installed versions compatible with bot, so that every
+        ``dependencies`` constraint is satisfied, loaded modules keeping their version. Modules of a level only depend
+        on modules of previous levels (or already loaded modules), so modules of a level can be loaded concurrently.
+        Conflicts are reported before anything is loaded.
+
+        :param typing.Iterable[str] names: Names of modules to load
+        :param required: Required version of some of these modules
+        :raise errors.MissingDependency: if no version of modules satisfies all constraints
+        :raise errors.DependencyCycle: if modules depend on each other
+        :return: Modules to load, by level
+        :rtype: typing.List[typing.List[Module]]
+        """
+        names = list(names)
+        # Requested modules may be loaded again (e.g. reloaded), with another version
+        installed = {name: module.folder for name, module in self.modules.items() if name not in names}
+        chosen = Resolver(self.index, self.config["modules_folder"], __version__, installed).resolve(names, required)
+        return self._levels({name: Module(self, name, candidate.folder) for name, candidate in chosen.items()
+                             if name not in installed})
+
+    @staticmethod
+    def _levels(modules: typing.Dict[str, Module]) -> typing.List[typing.List[Module]]:
+        """Sort modules in levels, modules of a level only depend on modules of previous levels"""
+        remaining = {name: {dep.name for dep in module.deps if dep.name in modules} for name, module in modules.items()}
+        levels = []
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps)
+            if not ready:
+                raise errors.DependencyCycle(f"Dependency cycle between modules: {' -> '.join(_find_cycle(remaining))}")
+            levels.append([modules[name] for name in ready])
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return levels
+
+    async def load_modules(self) -> None:
+        """
+        Load enabled modules and their dependencies
+
+        Dependency graph is checked first, then modules of each level are imported concurrently in threads,
+        instantiated, and their ``__setup__`` methods are awaited concurrently. Lazy modules which are not required by
+        other modules are only imported on first event they handle.
+
+        :raise errors.MissingDependency: if modules are missing or have incompatible versions
+        :raise errors.DependencyCycle: if modules depend on each other
+        """
+        await self._load_levels(self.resolve(self.config["enabled_modules"]))
+
+    async def _load_levels(self, levels: typing.List[typing.List[Module]],
+                           states: typing.Optional[typing.Dict[str, typing.Any]] = None) -> None:
+        required = self._required(levels)
+        states = states or {}
+        loop = asyncio.get_running_loop()
+        with concurrent.futures.ThreadPoolExecutor(self.import_workers, thread_name_prefix="bot_base_import") as pool:
+            for level in levels:
+                for module in level:
+                    self._add_import_path(module)
+                for module in [module for module in level if module.lazy and module.name not in required]:
+                    # State of an activated module is restored when it is activated again
+                    module.load_lazy(states.get(module.name))
+                    self._register(module)
+                    level.remove(module)
+                await asyncio.gather(*(loop.run_in_executor(pool, importlib.import_module, module.name)
+                                       for module in level))
+                for module in level:
+                    # Already imported, only instantiates main class
+                    module.load()
+                    module.restore(states.get(module.name))
+                await asyncio.gather(*(module.setup() for module in level))
+                for module in level:
+                    self._register(module)
+        self.index.save()
+
+    def _required(self, levels: typing.List[typing.List[Module]]) -> typing.Set[str]:
+        """Get modules required by loaded modules or modules of ``levels``, they are always imported (never lazy)"""
+        return {dep.name for module in [*self.modules.values(), *(m for level in levels for m in level)]
+                for dep in module.deps}
+
+    @staticmethod
+    def _add_import_path(module: Module) -> None:
+        # Other versions are imported from their own folder, before default one
+        if module.import_path is not None and module.import_path not in sys.path:
+            sys.path.insert(0, module.import_path)
+
+    def dependents(self, name: str) -> typing.List[str]:
+        """
+        Get loaded modules which depend on a module, directly or not
+
+        :param str name: Name of module
+        :return: Names of dependent modules, in load order
+        :rtype: typing.List[str]
+        """
+        found = set()
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            for module in self.modules.values():
+                if module.name not in found and any(dep.name == current for dep in module.deps):
+                    found.add(module.name)
+                    pending.append(module.name)
+        return [module for module in self.modules if module in found]
+
+    async def unload_module(self, name: str) -> typing.Any:
+        """
+        Tear down a module and forget its code
+
+        Module stops receiving events, ``__teardown__`` method of its main class is called (and awaited if it is a
+        coroutine), and module and its submodules are removed from :data:`sys.modules`. Enabled modules are not
+        changed, so module is loaded again on next boot.
+
+        :param str name: Name of module
+        :raise errors.ModuleNotFoundError: if module is not loaded
+        :raise errors.ModuleException: if loaded modules depend on it
+        :return: State of module, from ``__getstate__`` method of its main class
+        """
+        if name not in self.modules:
+            raise errors.ModuleNotFoundError(f"Module {name} is not loaded.")
+        dependents = self.dependents(name)
+        if dependents:
+            raise errors.ModuleException(f"Module {name} is required by {', '.join(dependents)}, unload them first.")
+        module = self.modules.pop(name)
+        self.dispatch_modules.pop(name, None)
+        self.handlers.clear()
+        state = await module.unload()
+        for key in [key for key in sys.modules if key == name or key.startswith(f"{name}.")]:
+            del sys.modules[key]
+        if module.import_path in sys.path:
+            sys.path.remove(module.import_path)
+        return state
+
+    async def reload_module(self, name: str) -> None:
+        """
+        Unload a module and modules depending on it, then import them again
+
+        State returned by ``__getstate__`` of old instance of main class is given to ``__setstate__`` of new instance,
+        before ``__setup__`` is called. New versions are resolved before anything is unloaded, and if they can't be
+        imported or set up, previous versions are loaded again with their state.
+
+        :Basic usage:
+
+        >>> import shutil, tempfile, types
+        >>> from config import Config
+        >>> folder = tempfile.mkdtemp()
+        >>> sources = {
+        ...     "doctest_counter": ("", "def __init__(self): self.count = 0\\n"
+        ...                             "    def __getstate__(self): return {'count': self.count}\\n"
+        ...                             "    def __setstate__(self, state): self.count = state['count']\\n"
+        ...                             "    def __setup__(self): print('count', self.count)\\n"
+        ...                             "    def __dispatch__(self, event): self.count += 1\\n"
+        ...                             "    def __teardown__(self): print('teardown counter')\\n"),
+        ...     "doctest_user": ('[dependencies]\\ndoctest_counter = ">=1.0"',
+        ...                      "def __setstate__(self, state): print('unexpected', state)\\n"
+        ...                      "    def __dispatch__(self, event): pass\\n"
+        ...                      "    def __teardown__(self): print('teardown user')\\n"),
+        ... }
+        >>> for module, (infos, body) in sources.items():
+        ...     os.mkdir(os.path.join(folder, module))
+        ...     with open(os.path.join(folder, module, "infos.toml"), "w") as file:
+        ...         _ = file.write(f'version = "1.0.0"\\nbot_version = "~=0.2.0"\\n{infos}\\n')
+        ...     with open(os.path.join(folder, module, "__init__.py"), "w") as file:
+        ...         _ = file.write(f"class Main:\\n    {body}\\n__main_class__ = Main\\n")
+        >>> sys.path.insert(0, folder)
+        >>> client = types.SimpleNamespace(config={"data_folder": folder}, get_config=lambda name: Config(None),
+        ...                                info=print)
+        >>> manager = ModuleManager(client)
+        >>> manager.config.set({"modules_folder": folder, "enabled_modules": ["doctest_user"]}, no_save=True)
+        >>> asyncio.run(manager.load_modules())
+        count 0
+        >>> manager.modules["doctest_counter"].dispatch("message")
+        >>> manager.dependents("doctest_counter")
+        ['doctest_user']
+        >>> asyncio.run(manager.unload_module("doctest_counter"))
+        Traceback (most recent call last):
+        ...
+        errors.ModuleException: Module doctest_counter is required by doctest_user, unload them first.
+        >>> asyncio.run(manager.reload_module("doctest_counter"))
+        teardown user
+        teardown counter
+        count 1
+        Module doctest_counter reloaded with doctest_user.
+
+        If new version is broken, previous one is restored:
+
+        >>> with open(os.path.join(folder, "doctest_counter", "__init__.py"), "a") as file:
+        ...     _ = file.write("raise RuntimeError('broken')\\n")
+        >>> try:
+        ...     asyncio.run(manager.reload_module("doctest_counter"))
+        ... except errors.ModuleException as e:
+        ...     print(e)
+        teardown user
+        teardown counter
+        count 1
+        Unable to reload module doctest_counter, previous version was restored: RuntimeError: broken
+        >>> sorted(manager.modules)
+        ['doctest_counter', 'doctest_user']
+
+        Lazy modules stay lazy, state of an activated one is given to new instance when it is activated again:
+
+        >>> os.mkdir(os.path.join(folder, "doctest_lazy_counter"))
+        >>> with open(os.path.join(folder, "doctest_lazy_counter", "infos.toml"), "w") as file:
+        ...     _ = file.write('version = "1.0.0"\\nbot_version = "~=0.2.0"\\nevents = ["message"]\\nlazy = true\\n')
+        >>> with open(os.path.join(folder, "doctest_lazy_counter", "__init__.py"), "w") as file:
+        ...     _ = file.write(f"class Main:\\n    {sources['doctest_counter'][1]}\\n__main_class__ = Main\\n")
+        >>> asyncio.run(manager.load_module_async("doctest_lazy_counter"))
+        >>> manager.modules["doctest_lazy_counter"].dispatch("message")
+        count 0
+        Module doctest_lazy_counter activated.
+        >>> asyncio.run(manager.reload_module("doctest_lazy_counter"))
+        teardown counter
+        Module doctest_lazy_counter reloaded.
+        >>> manager.modules["doctest_lazy_counter"].loaded
+        False
+        >>> manager.modules["doctest_lazy_counter"].dispatch("message")
+        count 1
+        Module doctest_lazy_counter activated.
+        >>> sys.path.remove(folder)
+        >>> shutil.rmtree(folder)
+
+        :param str name: Name of module
+        :raise errors.ModuleNotFoundError: if module is not loaded
+        :raise errors.MissingDependency: if new version has missing or incompatible dependencies
+        :raise errors.ModuleException: if new version can't be loaded, previous version is restored
+        """
+        if name not in self.modules:
+            raise errors.ModuleNotFoundError(f"Module {name} is not loaded.")
+        names = [name, *self.dependents(name)]
+        levels = self.resolve(names)
+        previous = {module: self.modules[module] for module in names}
+        # Code of previous versions, to load them again if new versions fail
+        code = {key: module for key, module in sys.modules.items() if key.split(".")[0] in previous}
+        states = {}
+        # Dependents first
+        for module in reversed(names):
+            states[module] = await self.unload_module(module)
+        importlib.invalidate_caches()
+        try:
+            await self._load_levels(levels, states)
+        except Exception as e:
+            for module in reversed(names):
+                if module in self.modules:
+                    await self.unload_module(module)
+            for key in [key for key in sys.modules if key.split(".")[0] in previous]:
+                del sys.modules[key]
+            sys.modules.update(code)
+            await self._load_levels(self._levels(previous), states)
+            raise errors.ModuleException(f"Unable to reload module {name}, previous version was restored: "
+                                         f"{type(e).__name__}: {e}") from e
+        self.client.info(f"Module {name} reloaded" + (f" with {', '.join(names[1:])}." if names[1:] else "."))
+
+    def required_intents(self) -> typing.Optional[typing.Set[str]]:
+        """
+        Get intents needed by enabled modules and their dependencies, from ``events`` and ``intents`` of their
+        infos.toml, without loading them
+
+        :return: Intent names, None if a module doesn't declare its events
+        :rtype: typing.Optional[typing.Set[str]]
+        """
+        names = intents.required_intents(())
+        seen = set()
+        pending = list(self.config["enabled_modules"])
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            module = Module(self, name)
+            try:
+                infos = module.infos
+            except (errors.ModuleNotFoundError, errors.IncompatibleModuleError):
+                # Reported when module is loaded
+                continue
+            pending.extend(infos.get("dependencies", {}))
+            if module.is_metamodule:
+                continue
+            events = infos.get("events")
+            needed = intents.required_intents(None if events == "*" else events, infos.get("intents", ()))
+            if needed is None:
+                return None
+            names |= needed
+        return names
+
+    def get_handlers(self, event: str) -> typing.Tuple[Module, ...]:
+        """
+        Get modules handling ``event``
+
+        Handlers of each event are cached until a module is registered or removed.
+
+        :Basic usage:
+
+        >>> import shutil, tempfile, types
+        >>> from config import Config
+        >>> folder = tempfile.mkdtemp()
+        >>> sources = {
+        ...     "doctest_infos": ('events = ["message"]', ""),
+        ...     "doctest_attribute": ("", "__events__ = ['typing']"),
+        ...     "doctest_methods": ("", "def on_message_edit(self): pass"),
+        ...     "doctest_star": ('events = "*"', "def on_message(self): pass"),
+        ... }
+        >>> for name, (infos, body) in sources.items():
+        ...     os.mkdir(os.path.join(folder, name))
+        ...     with open(os.path.join(folder, name, "infos.toml"), "w") as file:
+        ...         _ = file.write(f'version = "1.0.0"\\nbot_version = "~=0.2.0"\\n{infos}\\n')
+        ...     with open(os.path.join(folder, name, "__init__.py"), "w") as file:
+        ...         _ = file.write(f"class Main:\\n    {body}\\n    def __dispatch__(self, *args): pass\\n"
+        ...                        "__main_class__ = Main\\n")
+        >>> sys.path.insert(0, folder)
+        >>> client = types.SimpleNamespace(config={"data_folder": folder}, get_config=lambda name: Config(None))
+        >>> manager = ModuleManager(client)
+        >>> manager.config.set({"modules_folder": folder}, no_save=True)
+        >>> for name in ["doctest_infos", "doctest_attribute", "doctest_methods"]:
+        ...     module = Module(manager, name)
+        ...     module.load()
+        ...     _ = manager._register(module)
+        >>> [sorted(module.events) for module in manager]
+        [['message'], ['typing'], ['message_edit']]
+        >>> [module.name for module in manager.get_handlers("message")]
+        ['doctest_infos']
+        >>> star = Module(manager, "doctest_star")
+        >>> star.load()
+        >>> star.events is None
+        True
+        >>> _ = manager._register(star)
+        >>> [module.name for module in manager.get_handlers("message")]
+        ['doctest_infos', 'doctest_star']
+        >>> sys.path.remove(folder)
+        >>> shutil.rmtree(folder)
+
+        :param str event: Name of event
+        :return: Modules to dispatch event to
+        :rtype: typing.Tuple[Module, ...]
+        """
+        try:
+            return self.handlers[event]
+        except KeyError:
+            handlers = self.handlers[event] = tuple(module for module in self.dispatch_modules.values()
+                                                    if module.events is None or event in module.events)
+            return handlers
+
+    def queue_metrics(self) -> typing.Dict[str, typing.Dict[str, int]]:
+        """
+        Get counters of queues of modules using queued dispatch
+
+        :return: Metrics of each queue (see :meth:`ModuleQueue.metrics`), by module name
+        :rtype: typing.Dict[str, typing.Dict[str, int]]
+        """
+        return {name: module.queue.metrics() for name, module in self.dispatch_modules.items()
+                if module.queue is not None}
+
+    async def close(self) -> None:
+        """
+        Stop workers of module queues
+        """
+        for module in self.dispatch_modules.values():
+            if module.queue is not None:
+                await module.queue.stop()
 
     def __iter__(self):
         return self.dispatch_modules.values().__iter__()
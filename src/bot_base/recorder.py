@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import datetime
+import enum
+import functools
+import gzip
+import itertools
+import json
+import os
+import time
+import types
+import typing
+
+from bot_base.modules import __version__
+
+#: :class:`int`: Format version of record files
+VERSION = 1
+#: :class:`int`: How deep objects referenced by event arguments are recorded
+DEPTH = 2
+#: :class:`int`: Maximum number of recorded items of a collection
+MAX_ITEMS = 100
+#: :class:`str`: Key holding type of recorded objects
+TYPE = "__type__"
+
+
+class RecordedObject(types.SimpleNamespace):
+    """Object rebuilt from a record, with recorded public attributes"""
+
+
+class ReplayEvent(typing.NamedTuple):
+    #: :class:`float`: Time since start of record, in seconds
+    time: float
+    #: :class:`str`: Name of event
+    event: str
+    #: :class:`list`: Positional arguments
+    args: list
+    #: :class:`dict`: Keyword arguments
+    kwargs: dict
+
+
+@functools.lru_cache(maxsize=None)
+def _public_attributes(cls: type) -> typing.Tuple[str, ...]:
+    """Names of public properties and slots of a class"""
+    names = []
+    for name in dir(cls):
+        if name.startswith("_"):
+            continue
+        attribute = getattr(cls, name, None)
+        if isinstance(attribute, (property, functools.cached_property, types.MemberDescriptorType)) \
+                or type(attribute).__name__ == "CachedSlotProperty":
+            names.append(name)
+    return tuple(names)
+
+
+def serialize(value: typing.Any, depth: int = DEPTH) -> typing.Any:
+    """
+    Convert event argument to JSON compatible data, best effort
+
+    Objects are recorded as dicts of their public attributes, up to ``depth`` levels, then only their ``id`` and
+    ``name`` are recorded.
+
+    :Basic usage:
+
+    >>> serialize(types.SimpleNamespace(id=1, name="general", position=3), depth=0)
+    {'__type__': 'types.SimpleNamespace', 'id': 1, 'name': 'general'}
+    >>> serialize({"created": datetime.datetime(2020, 1, 1)})
+    {'created': {'__type__': 'datetime', 'iso': '2020-01-01T00:00:00'}}
+
+    :param value: Value to serialize
+    :param int depth: Number of levels of objects whose all public attributes are recorded
+    :return: JSON compatible data
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, enum.Enum):
+        return serialize(value.value, depth)
+    if isinstance(value, datetime.datetime):
+        return {TYPE: "datetime", "iso": value.isoformat()}
+    if isinstance(value, dict):
+        return {str(k): serialize(v, depth) for k, v in itertools.islice(value.items(), MAX_ITEMS)}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [serialize(v, depth) for v in itertools.islice(value, MAX_ITEMS)]
+    if isinstance(value, (bytes, bytearray)):
+        return None
+    data = {TYPE: f"{type(value).__module__}.{type(value).__qualname__}"}
+    if depth > 0:
+        names = _public_attributes(type(value)) + tuple(k for k in getattr(value, "__dict__", ())
+                                                       if not k.startswith("_"))
+    else:
+        names = ("id", "name")
+    for name in names:
+        try:
+            attribute = getattr(value, name)
+        except Exception:
+            continue
+        if callable(attribute) and not isinstance(attribute, enum.Enum):
+            continue
+        data[name] = serialize(attribute, depth - 1)
+    return data
+
+
+def deserialize(data: typing.Dict[str, typing.Any]) -> typing.Any:
+    """
+    Rebuild an object recorded by :func:`serialize`, used as JSON object hook
+
+    :Basic usage:
+
+    >>> deserialize({"__type__": "discord.channel.TextChannel", "id": 1})
+    RecordedObject(__type__='discord.channel.TextChannel', id=1)
+
+    :param typing.Dict[str, typing.Any] data: Decoded JSON object
+    :return: :class:`datetime.datetime`, :class:`RecordedObject`, or unchanged dict
+    """
+    type_ = data.get(TYPE)
+    if type_ is None:
+        return data
+    if type_ == "datetime":
+        return datetime.datetime.fromisoformat(data["iso"])
+    return RecordedObject(**data)
+
+
+class EventRecorder:
+    #: :class:`str`: Path of record file
+    path: str
+    #: :class:`int`: Number of recorded events
+    count: int
+    #: :class:`int`: Number of events which couldn't be recorded
+    errors: int
+
+    def __init__(self, path: str, depth: int = DEPTH, exclude: typing.Iterable[str] = ("socket_raw_receive",
+                                                                                       "socket_raw_send")) -> None:
+        """
+        Write events to a gzipped JSON lines file
+
+        First line holds format and bot versions, each other line is ``[time, event, args, kwargs]``.
+
+        :param str path: Path of record file
+        :param int depth: How deep objects referenced by event arguments are recorded
+        :param exclude: Events which are not recorded
+        """
+        self.path = path
+        self.depth = depth
+        self.exclude = frozenset(exclude)
+        self.count = 0
+        self.errors = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._file.write(json.dumps({"version": VERSION, "bot_version": __version__}) + "\n")
+        self._start = time.monotonic()
+
+    def record(self, event: str, args: tuple, kwargs: typing.Dict[str, typing.Any]) -> None:
+        """
+        Write an event
+
+        :param str event: Name of event
+        :param tuple args: Positional arguments of event
+        :param typing.Dict[str, typing.Any] kwargs: Keyword arguments of event
+        """
+        if event in self.exclude or self._file is None:
+            return
+        try:
+            line = json.dumps([round(time.monotonic() - self._start, 6), event, serialize(args, self.depth),
+                               serialize(kwargs, self.depth)], separators=(",", ":"))
+        except Exception:
+            # Recording must never break dispatch
+            self.errors += 1
+            return
+        self._file.write(line + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        """
+        Write remaining events and close file
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_events(path: str) -> typing.Iterator[ReplayEvent]:
+    """
+    Read events of a record file
+
+    :param str path: Path of record file
+    :return: Recorded events, in order
+    :rtype: typing.Iterator[ReplayEvent]
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header = json.loads(file.readline())
+        if header.get("version") != VERSION:
+            raise ValueError(f"Unsupported record version {header.get('version')}, expected {VERSION}.")
+        for line in file:
+            time_, event, args, kwargs = json.loads(line, object_hook=deserialize)
+            yield ReplayEvent(time_, event, args, kwargs)
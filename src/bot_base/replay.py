@@ -0,0 +1,97 @@
+"""
+Replay events recorded by a bot, offline
+
+Record events by creating bot with ``record_events="events.jsonl.gz"``, then replay them without network:
+
+.. code-block:: bash
+
+    python -m bot_base.replay datas/events.jsonl.gz --data-folder datas --speed 0
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import typing
+
+import discord
+
+from bot_base.bot_base import BotBase
+from bot_base.recorder import load_events
+
+
+class ReplayBot(BotBase):
+    def __init__(self, *args, **kwargs):
+        """
+        Bot which never connects to discord, events are dispatched from a record
+
+        Takes arguments of :class:`BotBase`. Configs are not watched, and recording is disabled.
+        """
+        kwargs.setdefault("config_watch", False)
+        if hasattr(discord, "Intents"):
+            kwargs.setdefault("intents", discord.Intents.default())
+        kwargs["record_events"] = None
+        super().__init__(*args, **kwargs)
+
+    async def start(self, *args, **kwargs):
+        """Start background services and load modules, without connecting"""
+        self.start_services()
+        await self.on_ready()
+
+    async def replay(self, path: str, speed: typing.Optional[float] = None) -> typing.Tuple[int, float]:
+        """
+        Dispatch recorded events
+
+        :param str path: Path of record file
+        :param typing.Optional[float] speed: Speed factor relative to recorded timing (1 for original speed), None
+            or 0 to dispatch events as fast as possible
+        :return: Number of dispatched events and duration (in seconds)
+        :rtype: typing.Tuple[int, float]
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        count = 0
+        for count, event in enumerate(load_events(path), 1):
+            if speed:
+                delay = start + event.time / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif count % 100 == 0:
+                # Let module tasks run
+                await asyncio.sleep(0)
+            self.dispatch(event.event, *event.args, **event.kwargs)
+        # Let tasks created by last events run
+        await asyncio.sleep(0)
+        return count, loop.time() - start
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded events into a bot, without network")
+    parser.add_argument("path", help="Record file")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="Speed factor relative to recorded timing, 0 (default) for maximum speed")
+    parser.add_argument("--data-folder", default="data", help="Data folder of bot")
+    parser.add_argument("--modules-folder", default="modules", help="Modules folder of bot")
+    parser.add_argument("--stats", action="store_true", help="Print timing of module handlers")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    async def run():
+        client = ReplayBot(data_folder=args.data_folder, modules_folder=args.modules_folder,
+                           dispatch_stats=args.stats)
+        await client.start()
+        try:
+            count, duration = await client.replay(args.path, args.speed)
+        finally:
+            await client.close()
+        print(f"{count} events replayed in {duration:.3f}s ({count / duration if duration else 0:.0f} events/s).")
+        if client.dispatch_stats is not None:
+            print(client.dispatch_stats.report(limit=50))
+
+    asyncio.run(run())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
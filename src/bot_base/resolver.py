@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import os
+import typing
+
+from packaging.specifiers import InvalidSpecifier
+from packaging.version import InvalidVersion, Version
+
+import errors
+from bot_base.module_index import ModuleIndex
+
+#: Folder of modules folder containing other installed versions of modules, as ``<name>/<version>/<name>``
+VERSIONS_FOLDER = ".versions"
+
+# Required version (None for any version) and name of module requiring it (None for modules asked by user)
+Constraint = typing.Tuple[typing.Optional[str], typing.Optional[str]]
+
+
+class Candidate(typing.NamedTuple):
+    #: :class:`str`: Name of module
+    name: str
+    #: :class:`packaging.version.Version`: Version of module
+    version: Version
+    #: :class:`str`: Folder of module
+    folder: str
+    #: :class:`typing.Dict` [:class:`str`, :class:`str`]: Required version of each dependency
+    dependencies: typing.Dict[str, str]
+
+
+def version_folders(modules_folder: str, name: str) -> typing.List[str]:
+    """
+    Get folders of installed versions of a module, default version first
+
+    Default version of module is ``<modules_folder>/<name>``, other versions are in
+    ``<modules_folder>/.versions/<name>/<version>/<name>``.
+
+    :Basic usage:
+
+    >>> version_folders("modules", "doctest_missing_module")
+    ['modules/doctest_missing_module']
+
+    :param str modules_folder: Modules folder
+    :param str name: Name of module
+    :return: Folders which may contain module, existing or not
+    :rtype: typing.List[str]
+    """
+    folders = [os.path.join(modules_folder, name)]
+    versions = os.path.join(modules_folder, VERSIONS_FOLDER, name)
+    try:
+        entries = sorted(os.listdir(versions))
+    except (FileNotFoundError, NotADirectoryError):
+        return folders
+    folders.extend(os.path.join(versions, entry, name) for entry in entries)
+    return folders
+
+
+class Resolver:
+    #: :class:`typing.Dict` [:class:`str`, :class:`str`]: Description of each conflict found, by module name
+    conflicts: typing.Dict[str, str]
+
+    def __init__(self, index: ModuleIndex, modules_folder: str, bot_version: str,
+                 installed: typing.Optional[typing.Dict[str, str]] = None) -> None:
+        """
+        Choose a version of each module so that all version constraints of ``dependencies`` are satisfied
+
+        Constraints are read from infos.toml of every installed version of modules. Search tries the default version
+        first, then other versions from newest to oldest, and backtracks when a choice leads to a conflict. Candidates
+        of modules, matching versions and failed partial choices are memoized, so each combination is only explored
+        once.
+
+        :Basic usage:
+
+        >>> resolver = Resolver(ModuleIndex(None), "modules", "0.2.0")
+        >>> resolver.resolve(["doctest_missing_module"])
+        Traceback (most recent call last):
+        ...
+        errors.MissingDependency: Unable to resolve modules:
+        Module doctest_missing_module not found here: modules/doctest_missing_module.
+        >>> resolver.resolve(["doctest_missing_module"], {"doctest_missing_module": "*"})
+        Traceback (most recent call last):
+        ...
+        errors.MissingDependency: Unable to resolve modules:
+        Invalid required version '*' of module doctest_missing_module.
+
+        :param ModuleIndex index: Parsed infos.toml of modules
+        :param str modules_folder: Modules folder
+        :param str bot_version: Version of bot, versions of modules incompatible with it are ignored
+        :param installed: Folder of each loaded module, these versions can't be changed
+        """
+        self.index = index
+        self.modules_folder = modules_folder
+        self.bot_version = bot_version
+        self.installed = installed or {}
+        self.conflicts = {}
+        self._candidates = {}
+        # Reasons why installed versions can't be used, by module name
+        self._rejected = {}
+        self._matching = {}
+        self._failed = set()
+
+    def candidates(self, name: str) -> typing.List[Candidate]:
+        """
+        Get usable versions of a module, in order of preference
+
+        :param str name: Name of module
+        :return: Loaded version if module is loaded, else default version followed by other versions, newest first
+        :rtype: typing.List[Candidate]
+        """
+        if name in self._candidates:
+            return self._candidates[name]
+        folders = [self.installed[name]] if name in self.installed else version_folders(self.modules_folder, name)
+        rejected = self._rejected[name] = []
+        found = []
+        for folder in folders:
+            candidate = self._candidate(name, folder, rejected)
+            if candidate is not None and all(candidate.version != other.version for other in found):
+                found.append(candidate)
+        # Default version stays first
+        found[1:] = sorted(found[1:], key=lambda candidate: candidate.version, reverse=True)
+        self._candidates[name] = found
+        return found
+
+    def _candidate(self, name: str, folder: str, rejected: typing.List[str]) -> typing.Optional[Candidate]:
+        infos = self.index.infos(folder)
+        if infos is None:
+            if not os.path.isdir(folder):
+                # Only default folder is listed when no other version is installed
+                rejected.append(f"Module {name} not found here: {folder}.")
+            else:
+                rejected.append(f"Module {name} doesn't have infos.toml: {folder}.")
+            return None
+        try:
+            version = Version(str(infos["version"]))
+        except (KeyError, InvalidVersion):
+            rejected.append(f"Module {name} has no valid version: {folder}.")
+            return None
+        if "bot_version" in infos and not self.index.is_compatible(folder, self.bot_version):
+            rejected.append(f"Module {name} {version} requires bot version {infos['bot_version']}, "
+                            f"bot is {self.bot_version}.")
+            return None
+        dependencies = {dep: str(required) for dep, required in infos.get("dependencies", {}).items()}
+        for dep, required in dependencies.items():
+            try:
+                ModuleIndex.specifier(required)
+            except InvalidSpecifier:
+                rejected.append(f"Module {name} {version} requires invalid version {required!r} of {dep}: {folder}.")
+                return None
+        return Candidate(name, version, folder, dependencies)
+
+    def matching(self, name: str, constraints: typing.Tuple[Constraint, ...]) -> typing.List[Candidate]:
+        """
+        Get versions of a module satisfying constraints, in order of preference
+
+        :param str name: Name of module
+        :param constraints: Required versions, with modules requiring them
+        :return: Matching candidates
+        :rtype: typing.List[Candidate]
+        """
+        key = (name, frozenset(required for required, _ in constraints))
+        if key not in self._matching:
+            self._matching[key] = [candidate for candidate in self.candidates(name)
+                                   if all(required is None or candidate.version in ModuleIndex.specifier(required)
+                                          for required in key[1])]
+        return self._matching[key]
+
+    def resolve(self, names: typing.Iterable[str],
+                required: typing.Optional[typing.Dict[str, str]] = None) -> typing.Dict[str, Candidate]:
+        """
+        Choose versions of modules and their dependencies
+
+        :param typing.Iterable[str] names: Names of modules to load
+        :param required: Required version of some of these modules
+        :raise errors.MissingDependency: if no consistent set of versions exists, with all conflicts found
+        :return: Chosen version of each module, including loaded modules which are required
+        :rtype: typing.Dict[str, Candidate]
+        """
+        required = required or {}
+        for name, version in required.items():
+            try:
+                ModuleIndex.specifier(version)
+            except InvalidSpecifier:
+                self.conflicts[name] = f"Invalid required version {version!r} of module {name}."
+        if self.conflicts:
+            raise errors.MissingDependency("Unable to resolve modules:\n" + "\n".join(self.conflicts.values()))
+        constraints = {name: ((required.get(name), None),) for name in names}
+        chosen = self._search({}, constraints)
+        if chosen is None:
+            raise errors.MissingDependency("Unable to resolve modules:\n" + "\n".join(self.conflicts.values()))
+        return chosen
+
+    def _search(self, chosen: typing.Dict[str, Candidate],
+                constraints: typing.Dict[str, typing.Tuple[Constraint, ...]]) -> typing.Optional[
+            typing.Dict[str, Candidate]]:
+        pending = [name for name in constraints if name not in chosen]
+        if not pending:
+            return chosen
+        options = {name: self.matching(name, constraints[name]) for name in pending}
+        impossible = [name for name in pending if not options[name]]
+        if impossible:
+            for name in impossible:
+                self._conflict(name, constraints[name])
+            return None
+        # Most constrained module first, so dead ends are found early
+        name = min(pending, key=lambda name: (len(options[name]), name))
+        for candidate in options[name]:
+            attempt = {**chosen, name: candidate}
+            # Constraints only depend on chosen versions, so a failed set of versions always fails
+            key = frozenset(option.folder for option in attempt.values())
+            if key in self._failed:
+                continue
+            merged = dict(constraints)
+            for dep, version in candidate.dependencies.items():
+                merged[dep] = merged.get(dep, ()) + ((version, name),)
+            clash = next((dep for dep in candidate.dependencies
+                          if dep in chosen and chosen[dep] not in self.matching(dep, merged[dep])), None)
+            if clash is not None:
+                self._conflict(clash, merged[clash])
+                result = None
+            else:
+                result = self._search(attempt, merged)
+            if result is not None:
+                return result
+            self._failed.add(key)
+        return None
+
+    def _conflict(self, name: str, constraints: typing.Tuple[Constraint, ...]) -> None:
+        candidates = self.candidates(name)
+        if not candidates:
+            self.conflicts[name] = "\n".join(self._rejected[name])
+            return
+        requirements = [f"{required} (required by {by})" for required, by in constraints
+                        if required is not None and by is not None]
+        requirements.extend(f"{required} (requested)" for required, by in constraints
+                            if required is not None and by is None)
+        if name in self.installed:
+            self.conflicts[name] = f"Loaded version {candidates[0].version} of module {name} doesn't satisfy " \
+                                   f"{', '.join(requirements)}."
+        else:
+            versions = ", ".join(str(candidate.version) for candidate in candidates)
+            self.conflicts[name] = f"No version of module {name} satisfies {', '.join(requirements)}, " \
+                                   f"installed versions: {versions}."
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+import typing
+
+import discord
+
+from bot_base.bot_base import BotBase
+
+
+class ShardedBotBase(BotBase, discord.AutoShardedClient):
+    def __init__(self, *args, **kwargs):
+        """
+        Bot running several shards in one process
+
+        Takes arguments of :class:`BotBase`, and ``shard_ids`` and ``shard_count`` of
+        :class:`discord.AutoShardedClient`. Configs are shared with other processes.
+        """
+        kwargs.setdefault("config_shared", True)
+        super().__init__(*args, **kwargs)
+
+
+def shard_ids(shard_count: int, processes: int, index: int) -> typing.List[int]:
+    """
+    Get shards run by a worker process
+
+    :Basic usage:
+
+    >>> shard_ids(8, 3, 0)
+    [0, 3, 6]
+    >>> shard_ids(8, 3, 2)
+    [2, 5]
+
+    :param int shard_count: Total number of shards
+    :param int processes: Number of worker processes
+    :param int index: Index of worker process
+    :return: Ids of shards of worker
+    :rtype: typing.List[int]
+    """
+    return list(range(index, shard_count, processes))
+
+
+def _run_worker(token: str, ids: typing.List[int], shard_count: int, bot_kwargs: typing.Dict[str, typing.Any],
+                setup: typing.Optional[typing.Callable[[], typing.Any]]) -> None:
+    """Entry point of worker processes"""
+    if setup is not None:
+        setup()
+    # Supervisor handles Ctrl+C, workers are stopped with SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    client = ShardedBotBase(shard_ids=ids, shard_count=shard_count, **bot_kwargs)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.add_signal_handler(signal.SIGTERM, lambda: loop.create_task(client.close()))
+    try:
+        loop.run_until_complete(client.start(token))
+    finally:
+        # Already closed on SIGTERM
+        if not client.is_closed():
+            loop.run_until_complete(client.close())
+        loop.close()
+
+
+class Supervisor:
+    #: :class:`int`: Total number of shards
+    shard_count: int
+    #: :class:`int`: Number of worker processes
+    processes: int
+    #: :class:`float`: Time (in seconds) to wait before restarting a worker which crashed, doubled on each crash
+    restart_delay: float
+
+    def __init__(self, token: str, shard_count: int, processes: int, restart_delay: float = 5.,
+                 max_restart_delay: float = 300., setup: typing.Optional[typing.Callable[[], typing.Any]] = None,
+                 **bot_kwargs) -> None:
+        """
+        Run shards of bot in several worker processes, and restart workers which crash
+
+        Workers share ``data_folder``: config files are locked while they are written, and fields changed by other
+        workers are kept (see ``shared`` parameter of :class:`config.Config`).
+
+        :Basic usage:
+
+        >>> supervisor = Supervisor(token, shard_count=8, processes=4, data_folder="datas") #doctest: +SKIP
+        >>> supervisor.run() #doctest: +SKIP
+
+        :param str token: Discord token
+        :param int shard_count: Total number of shards
+        :param int processes: Number of worker processes
+        :param float restart_delay: Time to wait before restarting a crashed worker
+        :param float max_restart_delay: Maximum time to wait before restarting a worker which keeps crashing
+        :param setup: Function called at start of each worker, e.g. to setup logging, must be picklable
+        :param bot_kwargs: Arguments of :class:`ShardedBotBase`
+        """
+        self.token = token
+        self.shard_count = shard_count
+        self.processes = min(processes, shard_count)
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.setup = setup
+        self.bot_kwargs = bot_kwargs
+        self.log = logging.getLogger("bot_base.sharding")
+        self.workers = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._delays = {}
+        self._restart_at = {}
+        self._started_at = {}
+        self._stopping = False
+
+    def start_worker(self, index: int) -> None:
+        """
+        Start (or restart) a worker process
+
+        :param int index: Index of worker
+        """
+        ids = shard_ids(self.shard_count, self.processes, index)
+        process = self._context.Process(target=_run_worker, name=f"shards-{index}",
+                                        args=(self.token, ids, self.shard_count, self.bot_kwargs, self.setup))
+        process.start()
+        self.workers[index] = process
+        self._started_at[index] = time.monotonic()
+        self.log.info(f"Worker {index} started with shards {ids} (pid {process.pid}).")
+
+    def check_workers(self) -> None:
+        """
+        Restart workers which stopped, after a delay growing with successive crashes
+        """
+        now = time.monotonic()
+        for index, process in list(self.workers.items()):
+            if process.is_alive():
+                continue
+            if index not in self._restart_at:
+                if now - self._started_at[index] > self.max_restart_delay:
+                    # Worker ran fine for a while, this is not a crash loop
+                    self._delays.pop(index, None)
+                delay = self._delays.get(index, self.restart_delay)
+                self.log.error(f"Worker {index} stopped with exit code {process.exitcode}, restarting in {delay}s.")
+                self._restart_at[index] = now + delay
+                self._delays[index] = min(delay * 2, self.max_restart_delay)
+            elif now >= self._restart_at[index]:
+                del self._restart_at[index]
+                self.start_worker(index)
+
+    def stop(self, timeout: float = 30.) -> None:
+        """
+        Stop all workers
+
+        :param float timeout: Time to wait for workers to close before killing them
+        """
+        self._stopping = True
+        for process in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.workers.values():
+            process.join(max(0., deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+
+    def run(self, interval: float = 1.) -> None:
+        """
+        Start workers and supervise them until interrupted
+
+        :param float interval: Time between two checks of workers
+        """
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        for index in range(self.processes):
+            self.start_worker(index)
+        try:
+            while not self._stopping:
+                time.sleep(interval)
+                self.check_workers()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if not self._stopping:
+                self.stop()
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import json
+import math
+import time
+import typing
+
+from utils import files
+
+#: :class:`float`: Ratio between bounds of two consecutive histogram buckets
+BUCKET_RATIO = 2 ** (1 / 4)
+#: :class:`float`: Upper bound of first histogram bucket, in seconds
+BUCKET_MIN = 1e-6
+
+
+class EventStats:
+    #: :class:`int`: Number of calls
+    count: int
+    #: :class:`float`: Cumulative time of calls, in seconds
+    total: float
+    #: :class:`float`: Longest call, in seconds
+    max: float
+    #: :class:`int`: Number of calls which raised an exception
+    errors: int
+    #: :class:`typing.Dict` [:class:`int`, :class:`int`]: Number of calls by histogram bucket
+    buckets: typing.Dict[int, int]
+
+    def __init__(self) -> None:
+        """
+        Timing of calls of one handler
+
+        Durations are counted in a histogram with logarithmic buckets, so percentiles are known within 20% whatever
+        number of calls.
+
+        :Basic usage:
+
+        >>> stats = EventStats()
+        >>> for duration in (0.001, 0.002, 0.003, 0.1):
+        ...     stats.add(duration)
+        >>> stats.count, stats.max
+        (4, 0.1)
+        >>> 0.002 <= stats.percentile(50) < 0.0025
+        True
+        >>> 0.1 <= stats.percentile(99) < 0.12
+        True
+        """
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+        self.errors = 0
+        self.buckets = {}
+
+    def add(self, duration: float, error: bool = False) -> None:
+        """
+        Record a call
+
+        :param float duration: Duration of call, in seconds
+        :param bool error: Whether call raised an exception
+        """
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        if error:
+            self.errors += 1
+        bucket = 0
+        if duration > BUCKET_MIN:
+            bucket = math.ceil(math.log(duration / BUCKET_MIN, BUCKET_RATIO))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get duration under which ``percent`` % of calls lasted
+
+        :param float percent: Percentage of calls
+        :return: Upper bound of histogram bucket, in seconds
+        :rtype: float
+        """
+        threshold = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= threshold:
+                return BUCKET_MIN * BUCKET_RATIO ** bucket
+        return 0.
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Get summary of calls
+
+        :return: Count, errors, total, mean, max, p50, p95 and p99 durations (in seconds)
+        :rtype: typing.Dict[str, typing.Any]
+        """
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class DispatchStats:
+    #: :class:`typing.Dict` [:class:`typing.Tuple` [:class:`str`, :class:`str`], :class:`EventStats`]: Timing of
+    #: each (module, event) pair
+    entries: typing.Dict[typing.Tuple[str, str], EventStats]
+
+    def __init__(self) -> None:
+        """
+        Timing of event handlers of modules
+
+        :Basic usage:
+
+        >>> stats = DispatchStats()
+        >>> handler = stats.wrap("my_module", lambda event, *args: None)
+        >>> handler("message", "content")
+        >>> stats.get("my_module", "message").count
+        1
+        >>> list(stats.snapshot())
+        ['my_module.message']
+        """
+        self.entries = {}
+        self._task = None
+
+    def get(self, module: str, event: str) -> EventStats:
+        """
+        Get timing of ``event`` handler of ``module``
+
+        :param str module: Name of module
+        :param str event: Name of event
+        :return: Timing of handler
+        :rtype: EventStats
+        """
+        try:
+            return self.entries[module, event]
+        except KeyError:
+            stats = self.entries[module, event] = EventStats()
+            return stats
+
+    def wrap(self, module: str, handler: typing.Callable, awaited: bool = False) -> typing.Callable:
+        """
+        Time calls of a ``__dispatch__`` method
+
+        If caller awaits returned awaitables (e.g. queue workers), they are timed until their end. Otherwise tasks and
+        futures returned by handler are timed until their end with a callback, and other awaitables (which caller
+        ignores) are not changed and only the synchronous part of call is timed.
+
+        :Basic usage:
+
+        >>> stats = DispatchStats()
+        >>> async def main():
+        ...     handler = stats.wrap("my_module", lambda event: asyncio.ensure_future(asyncio.sleep(0.01)))
+        ...     await handler("message")
+        >>> asyncio.run(main())
+        >>> stats.get("my_module", "message").max >= 0.01
+        True
+
+        :param str module: Name of module
+        :param handler: ``__dispatch__`` method of module
+        :param bool awaited: Caller awaits awaitables returned by handler
+        :return: Function to call instead of handler
+        """
+
+        @functools.wraps(handler)
+        def timed(event, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = handler(event, *args, **kwargs)
+            except Exception:
+                self.get(module, event).add(time.perf_counter() - start, error=True)
+                raise
+            if awaited and inspect.isawaitable(result):
+                return self._timed(module, event, start, result)
+            if asyncio.isfuture(result):
+                result.add_done_callback(functools.partial(self._done, module, event, start))
+                return result
+            self.get(module, event).add(time.perf_counter() - start)
+            return result
+
+        return timed
+
+    async def _timed(self, module: str, event: str, start: float, awaitable: typing.Awaitable) -> typing.Any:
+        try:
+            result = await awaitable
+        except Exception:
+            self.get(module, event).add(time.perf_counter() - start, error=True)
+            raise
+        self.get(module, event).add(time.perf_counter() - start)
+        return result
+
+    def _done(self, module: str, event: str, start: float, future: asyncio.Future) -> None:
+        error = future.cancelled() or future.exception() is not None
+        self.get(module, event).add(time.perf_counter() - start, error=error)
+
+    def snapshot(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        Get summary of all handlers, slowest first
+
+        :return: Summary (see :meth:`EventStats.to_dict`) by ``module.event``
+        :rtype: typing.Dict[str, typing.Dict[str, typing.Any]]
+        """
+        entries = sorted(self.entries.items(), key=lambda item: item[1].total, reverse=True)
+        return {f"{module}.{event}": stats.to_dict() for (module, event), stats in entries}
+
+    def report(self, limit: int = 10) -> str:
+        """
+        Build a human readable summary of slowest handlers
+
+        :param int limit: Maximum number of handlers in summary
+        :return: One line per handler
+        :rtype: str
+        """
+        lines = ["Dispatch stats (count, errors, total, p50, p95, p99):"]
+        for name, stats in list(self.snapshot().items())[:limit]:
+            lines.append(f"{name}: {stats['count']} calls, {stats['errors']} errors, {stats['total'] * 1e3:.1f}ms, "
+                         f"{stats['p50'] * 1e3:.3f}ms, {stats['p95'] * 1e3:.3f}ms, {stats['p99'] * 1e3:.3f}ms")
+        return "\n".join(lines)
+
+    def dump(self, path: str) -> None:
+        """
+        Write summary of all handlers to a JSON file
+
+        :param str path: Path of file
+        """
+        files.atomic_write({path: json.dumps(self.snapshot(), indent=4)})
+
+    def reset(self) -> None:
+        """
+        Forget all recorded calls
+        """
+        self.entries = {}
+
+    def start(self, interval: float, log: typing.Optional[typing.Callable[[str], typing.Any]] = None,
+              path: typing.Optional[str] = None) -> None:
+        """
+        Periodically log summary and/or write it to a file, in running event loop
+
+        :param float interval: Time between two dumps, in seconds
+        :param log: Function called with summary
+        :param str path: Path of JSON file
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._dump_every(interval, log, path))
+
+    def stop(self) -> None:
+        """
+        Stop periodic dumps
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _dump_every(self, interval: float, log: typing.Optional[typing.Callable[[str], typing.Any]],
+                          path: typing.Optional[str]) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            if not self.entries:
+                continue
+            if log is not None:
+                log(self.report())
+            if path is not None:
+                # Snapshot is taken in loop, only synced write runs in a thread
+                data = {path: json.dumps(self.snapshot(), indent=4)}
+                await asyncio.get_running_loop().run_in_executor(None, files.atomic_write, data)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+import typing
+
+from bot_base.resolver import VERSIONS_FOLDER
+
+if typing.TYPE_CHECKING:
+    from bot_base.bot_base import BotBase
+
+
+class LoopWatchdog:
+    #: :class:`float`: Time (in seconds) without loop tick after which loop is considered stalled
+    threshold: float
+    #: :class:`float`: Minimum time (in seconds) between two reports
+    report_interval: float
+    #: :class:`int`: Number of detected stalls, including unreported ones
+    stalls: int
+
+    def __init__(self, client: BotBase, threshold: float = 1., report_interval: float = 60.) -> None:
+        """
+        Thread detecting when event loop of client is blocked
+
+        Loop ticks every ``threshold / 4`` seconds. When it didn't tick for more than ``threshold`` seconds, stack of
+        loop thread is captured, and stall is reported with :meth:`BotBase.warning` (once loop runs again), with module
+        and event being dispatched.
+
+        :Basic usage:
+
+        >>> watchdog = LoopWatchdog(client, threshold=0.5) #doctest: +SKIP
+        >>> watchdog.start() #doctest: +SKIP
+
+        :param BotBase client: Client whose loop is watched
+        :param float threshold: Time without tick after which loop is considered stalled
+        :param float report_interval: Minimum time between two reports
+        """
+        self.client = client
+        self.threshold = threshold
+        self.report_interval = report_interval
+        self.stalls = 0
+        self._loop = None
+        self._thread = None
+        self._thread_id = None
+        self._handle = None
+        self._stopped = threading.Event()
+        self._last_tick = 0.
+        self._last_report = None
+        self._modules_folder = None
+
+    @property
+    def running(self) -> bool:
+        """Check if watchdog is running"""
+        return self._thread is not None
+
+    def start(self) -> None:
+        """
+        Start watching running event loop
+        """
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        # Config is not read from watchdog thread
+        self._modules_folder = os.path.abspath(self.client.modules.config["modules_folder"]) + os.sep
+        self._stopped.clear()
+        self._tick()
+        self._thread = threading.Thread(target=self._watch, name="bot_base_watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop watching loop
+        """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _tick(self) -> None:
+        self._last_tick = time.monotonic()
+        self._handle = self._loop.call_later(self.threshold / 4, self._tick)
+
+    def _watch(self) -> None:
+        # Tick of stall being reported, so each stall is captured once
+        stalled_tick = None
+        while not self._stopped.wait(self.threshold / 4):
+            last_tick = self._last_tick
+            lag = time.monotonic() - last_tick
+            if lag <= self.threshold or last_tick == stalled_tick:
+                continue
+            stalled_tick = last_tick
+            self.stalls += 1
+            now = time.monotonic()
+            if self._last_report is not None and now - self._last_report < self.report_interval:
+                continue
+            self._last_report = now
+            message = self._describe(lag)
+            try:
+                self._loop.call_soon_threadsafe(self.client.warning, message)
+            except RuntimeError:
+                # Loop is closed
+                return
+
+    def _describe(self, lag: float) -> str:
+        frame = sys._current_frames().get(self._thread_id)
+        stack = traceback.format_stack(frame) if frame is not None else []
+        current = getattr(self.client, "current_dispatch", None)
+        if current is not None:
+            culprit = f"module {current[0]} handling event {current[1]}"
+        else:
+            culprit = self._module_in_stack(frame) or "unknown code"
+        return f"Event loop blocked for more than {lag:.2f}s by {culprit} ({self.stalls} stalls so far), " \
+               f"stack:\n{''.join(stack)}"
+
+    def _module_in_stack(self, frame) -> typing.Optional[str]:
+        """Find innermost frame of a module, for stalls outside of dispatch (e.g. in tasks)"""
+        while frame is not None:
+            path = os.path.abspath(frame.f_code.co_filename)
+            if path.startswith(self._modules_folder):
+                parts = os.path.relpath(path, self._modules_folder).split(os.sep)
+                # Other versions are in .versions/<name>/<version>/<name>
+                module = parts[1] if parts[0] == VERSIONS_FOLDER and len(parts) > 1 else parts[0]
+                return f"module {module} ({frame.f_code.co_name})"
+            frame = frame.f_back
+        return None
@@ -1,4 +1,10 @@
 from . import config_types
 from .base import Config
+from .serializers import BinaryCache, JsonSerializer, Serializer, TomlSerializer
+from .store import ConfigStore
+from .transaction import Transaction
+from .watcher import ConfigWatcher
+from .writer import ConfigWriter
 
-__all__ = ["Config", "config_types"]
+__all__ = ["Config", "ConfigWatcher", "ConfigWriter", "Transaction", "Serializer", "TomlSerializer", "JsonSerializer",
+           "BinaryCache", "ConfigStore", "config_types"]
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import typing
 
-import toml
+from config.store import ConfigStore
+from config.serializers import BinaryCache, Serializer, TomlSerializer
+from config.transaction import Transaction
+from utils import files
+
+if typing.TYPE_CHECKING:
+    from config.writer import ConfigWriter
 
 BaseType = typing.TypeVar("BaseType")
 
@@ -15,7 +22,27 @@ class Config:
     #: :class:`typing.Type` [:class:`BaseType`]: Current fields
     fields: typing.Dict[str, BaseType]
 
-    def __init__(self, path: typing.Optional[str]) -> None:
+    #: :class:`typing.Optional` [:class:`ConfigWriter`]: Write-behind engine used to save config
+    writer: typing.Optional[ConfigWriter]
+
+    #: :class:`Serializer`: Format of config file
+    serializer: Serializer
+
+    #: :class:`typing.Optional` [:class:`BinaryCache`]: Binary copy of config file, faster to read
+    cache: typing.Optional[BinaryCache]
+
+    #: :class:`typing.Optional` [:class:`ConfigStore`]: Database holding config, instead of a file
+    store: typing.Optional[ConfigStore]
+
+    #: :class:`bool`: Check if file changed on each read, disabled when config is watched by a :class:`ConfigWatcher`
+    auto_reload: bool
+
+    #: :class:`bool`: Config file is also written by other processes
+    shared: bool
+
+    def __init__(self, path: typing.Optional[str], writer: typing.Optional[ConfigWriter] = None,
+                 serializer: typing.Optional[Serializer] = None, binary_cache: bool = False,
+                 store: typing.Optional[ConfigStore] = None, shared: bool = False) -> None:
         """
         Create config object
 
@@ -23,10 +50,30 @@ class Config:
 
         >>> config = Config("doctest_config.toml")
 
-        :param str path: Path of config file
+        :param str path: Path of config file, or name of config if it is in a ``store``
+        :param typing.Optional[ConfigWriter] writer: Write-behind engine, if None config is saved immediately
+        :param typing.Optional[Serializer] serializer: Format of config file, TOML by default
+        :param bool binary_cache: Keep a binary copy of config file, used when file didn't change
+        :param typing.Optional[ConfigStore] store: Keep config in this database instead of a file
+        :param bool shared: Config file is also written by other processes: file is locked while it is written, and
+            fields changed by other processes are kept
         """
         self.fields = {}
         self.path = path
+        self.writer = writer
+        self.serializer = serializer if serializer is not None else TomlSerializer()
+        self.store = store
+        self.cache = BinaryCache(path) if binary_cache and path is not None and store is None else None
+        self.auto_reload = True
+        self.shared = shared
+        # Signature of config file when it was last read or written, ``()`` if never read
+        self._signature = ()
+        # Fields changed since last write, only these are written to a store
+        self._dirty = set()
+        self._listeners = []
+        self._transaction = None
+        self._transaction_owner = None
+        self.__transaction_lock = None
 
     def register(self, name: str, type_: typing.Type[BaseType]) -> None:
         """
@@ -57,9 +104,16 @@ class Config:
         >>> config.set({"my_parameter": 3}) #doctest: +SKIP
         >>> config.set({"my_parameter": 4}, no_save=True)
 
+        If a :meth:`transaction` is open (by current task, for ``async with``), values are only applied when it ends.
+
         :type values: dict
         :param values: dict of parameters
+        :param bool no_save: Don't save config
         """
+        if self._owns_transaction():
+            self._transaction.set(values, no_save=no_save)
+            return
+        changed = []
         for k, v in values.items():
             try:
 
@@ -67,13 +121,137 @@ class Config:
             except KeyError:
                 # TODO: trouver un moyen de warn
                 pass
+            else:
+                changed.append(k)
+        self._notify(changed)
         if not no_save:
             self.save()
 
+    def transaction(self) -> Transaction:
+        """
+        Group several :meth:`set` calls: values are checked together and applied at exit, with a single save and a
+        single change notification. If a value is incorrect, nothing is applied.
+
+        Can also be used with ``async with``, then coroutines updating this config wait for each other. Changes made
+        by other tasks outside of a transaction meanwhile are applied immediately.
+
+        Basic usage:
+
+        >>> from config.config_types import factory, Int
+        >>> config = Config(None)
+        >>> config.register("first", factory(Int, min=0))
+        >>> config.register("second", factory(Int, min=0))
+        >>> with config.transaction():
+        ...     config.set({"first": 1})
+        ...     config.set({"second": 2})
+        >>> config["first"], config["second"]
+        (1, 2)
+        >>> with config.transaction(): # doctest: +IGNORE_EXCEPTION_DETAIL
+        ...     config.set({"first": 3})
+        ...     config.set({"second": -1})
+        Traceback (most recent call last):
+        ValueError: ...
+        >>> config["first"], config["second"]
+        (1, 2)
+        >>> async def update():
+        ...     async with config.transaction():
+        ...         config.set({"first": 5})
+        ...         await asyncio.sleep(0)
+        ...         config.set({"second": -1})
+        >>> async def other():
+        ...     await asyncio.sleep(0)
+        ...     config.set({"first": 7})
+        ...     print(config["first"])
+        >>> async def main():
+        ...     await asyncio.gather(update(), other(), return_exceptions=True)
+        >>> asyncio.run(main())
+        7
+        >>> config["first"], config["second"]
+        (7, 2)
+
+        :return: New transaction
+        :rtype: Transaction
+        """
+        return Transaction(self)
+
+    def _owns_transaction(self) -> bool:
+        """Check if open transaction belongs to current task, transactions opened with ``with`` belong to anyone"""
+        if self._transaction is None:
+            return False
+        if self._transaction._owner is None:
+            return True
+        try:
+            return asyncio.current_task() is self._transaction._owner
+        except RuntimeError:
+            # No running loop, e.g. in another thread
+            return False
+
+    @property
+    def _transaction_lock(self) -> asyncio.Lock:
+        # Created on first use, so it is bound to running loop
+        if self.__transaction_lock is None:
+            self.__transaction_lock = asyncio.Lock()
+        return self.__transaction_lock
+
+    def _apply(self, values: typing.Dict[str, typing.Any], load: bool = False) -> None:
+        """Set (or load) all values, or none of them if one is incorrect, and notify listeners"""
+        unknown = values.keys() - self.fields.keys()
+        if unknown:
+            raise KeyError(f"Unknown config fields: {', '.join(sorted(unknown))}")
+        backup = {k: dict(self.fields[k].__dict__) for k in values}
+        try:
+            for k, v in values.items():
+                if load:
+                    self.fields[k].load(v)
+                else:
+                    self.fields[k].set(v)
+        except Exception:
+            for k, attributes in backup.items():
+                self.fields[k].__dict__.clear()
+                self.fields[k].__dict__.update(attributes)
+            raise
+        self._notify(values.keys())
+
+    def add_listener(self, listener: typing.Callable[[Config, typing.List[str]], typing.Any]) -> None:
+        """
+        Call ``listener`` with config and names of changed fields each time config is changed or reloaded
+
+        Basic usage:
+
+        >>> from config.config_types import factory, Int
+        >>> config = Config(None)
+        >>> config.register("my_parameter", factory(Int))
+        >>> config.add_listener(lambda config, fields: print(fields))
+        >>> config.set({"my_parameter": 3})
+        ['my_parameter']
+
+        :param listener: Function to call
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: typing.Callable[[Config, typing.List[str]], typing.Any]) -> None:
+        """
+        Stop calling ``listener`` on changes
+
+        :param listener: Function to remove
+        """
+        self._listeners.remove(listener)
+
+    def _notify(self, fields: typing.Iterable[str]) -> None:
+        fields = list(fields)
+        self._dirty.update(fields)
+        if fields:
+            for listener in list(self._listeners):
+                listener(self, fields)
+
     def save(self) -> None:
         """
         Save config to ``self.file``
 
+        If config has a :attr:`writer`, the write is delayed and merged with other changes. Otherwise file is replaced
+        immediately, and synced to disk in background with other files written meanwhile (see
+        :data:`utils.files.deferred_sync`).
+
         Basic usage:
 
         >>> from config.config_types import factory, Int
@@ -83,13 +261,102 @@ class Config:
         >>> config.save() #doctest: +SKIP
         """
         if self.path is not None:
-            os.makedirs(os.path.dirname(self.path), exist_ok=True)
-            with open(self.path, 'w') as file:
-                toml.dump({k: v.to_save() for k, v in self.fields.items()}, file)
+            if self.writer is not None:
+                self.writer.mark_dirty(self)
+            else:
+                Config.write_all([self], fsync=False)
+
+    def write(self) -> None:
+        """
+        Write config to ``self.file`` immediately
+
+        File is replaced atomically, so it is never seen truncated or half-written. In a :attr:`store`, only changed
+        fields are written.
+
+        Basic usage:
+
+        >>> from config.config_types import factory, Int
+        >>> config = Config("doctest_config.toml")
+        >>> config.register("my_parameter", factory(Int))
+        >>> config.set({"my_parameter": 3}, no_save=True)
+        >>> config.write() #doctest: +SKIP
+        """
+        Config.write_all([self])
+
+    @staticmethod
+    def write_all(configs: typing.Iterable[Config], fsync: bool = True) -> None:
+        """
+        Write several configs at once, with a single sync to disk
+
+        Basic usage:
+
+        >>> from config.config_types import factory, Int
+        >>> config = Config("doctest_config.toml")
+        >>> other_config = Config("doctest_other_config.toml")
+        >>> Config.write_all([config, other_config]) #doctest: +SKIP
+
+        :param typing.Iterable[Config] configs: Configs to write
+        :param bool fsync: Sync files before returning, else they are synced in background
+        """
+        configs = [config for config in configs if config.path is not None]
+        stores = {}
+        for config in configs:
+            if config.store is not None:
+                stores.setdefault(config.store, {})[config.path] = {k: config.fields[k].to_save()
+                                                                     for k in config._dirty if k in config.fields}
+                config._dirty.clear()
+        for store, values in stores.items():
+            store.save_many(values)
+        configs = [config for config in configs if config.store is None]
+        with files.locked(config.path for config in configs if config.shared):
+            for config in configs:
+                if config.shared and config._file_signature() != config._signature:
+                    config._merge()
+            data = {config: config._to_save() for config in configs}
+            contents = {config: config.serializer.dumps(data[config]) for config in configs}
+            files.atomic_write({config.path: contents[config] for config in configs}, fsync=fsync)
+        if not fsync:
+            files.deferred_sync.add(config.path for config in configs)
+        for config in configs:
+            config._signature = config._file_signature()
+            config._dirty.clear()
+            if config.cache is not None and config._signature is not None:
+                config.cache.store(config._signature, contents[config], data[config])
+
+    def _merge(self) -> None:
+        """Read fields written by another process, keeping fields changed here since last write"""
+        changed = {k: self.fields[k].to_save() for k in self._dirty if k in self.fields}
+        self._read()
+        self._apply(changed, load=True)
+        self._dirty.update(changed)
+
+    def dumps(self) -> bytes:
+        """
+        Serialize config
+
+        Basic usage:
+
+        >>> from config.config_types import factory, Int
+        >>> config = Config("doctest_config.toml")
+        >>> config.register("my_parameter", factory(Int))
+        >>> config.set({"my_parameter": 3}, no_save=True)
+        >>> config.dumps()
+        b'my_parameter = 3\\n'
+
+        :return: Content of config file
+        :rtype: bytes
+        """
+        return self.serializer.dumps(self._to_save())
+
+    def _to_save(self) -> typing.Dict[str, typing.Any]:
+        return {k: v.to_save() for k, v in self.fields.items()}
 
     def load(self) -> None:
         """
-        Load config from ``self.file``
+        Load config from ``self.file`` if it changed since last load or save
+
+        The file is only parsed again when its inode, size or modification time changed, and is only written back
+        when it is missing or doesn't contain all registered fields.
 
         Basic usage:
 
@@ -104,18 +371,88 @@ class Config:
         >>> new_config["my_parameter"] #doctest: +SKIP
         3
         """
-        if self.path is not None:
-            try:
-                with open(self.path, 'r') as file:
-                    self.set(toml.load(file))
-            except FileNotFoundError:
-                pass
+        if self.path is not None and self._file_signature() != self._signature:
+            self.reload()
+
+    def reload(self) -> None:
+        """
+        Unconditionally load config from ``self.file``
+
+        Basic usage:
+
+        >>> from config.config_types import factory, Int
+        >>> config = Config("doctest_config.toml")
+        >>> config.register("my_parameter", factory(Int))
+        >>> config.reload() #doctest: +SKIP
+        """
+        if self.path is None:
+            return
+        missing = self.fields.keys() - self._read().keys()
+        if missing:
+            # Write missing fields (or whole file) with their default values
+            self._dirty.update(missing)
             self.save()
 
+    def refresh(self) -> bool:
+        """
+        Read config file again if it changed since last read or write, without ever writing it
+
+        Basic usage:
+
+        >>> from config.config_types import factory, Int
+        >>> config = Config("doctest_config.toml")
+        >>> config.register("my_parameter", factory(Int))
+        >>> config.refresh() #doctest: +SKIP
+        False
+
+        :return: True if config was read again
+        :rtype: bool
+        """
+        if self.path is not None and self._file_signature() != self._signature:
+            self._read()
+            return True
+        return False
+
+    def _read(self) -> typing.Dict[str, typing.Any]:
+        """Read config file and set fields, without ever writing it"""
+        if self.store is not None:
+            self._signature = self._file_signature()
+            values = self.store.load(self.path)
+            self._apply({k: v for k, v in values.items() if k in self.fields}, load=True)
+            self._dirty.difference_update(values)
+            return values
+        try:
+            with open(self.path, 'rb') as file:
+                self._signature = self._file_signature(file.fileno())
+                if self.cache is not None:
+                    values = self.cache.load(file, self._signature, self.serializer.loads)
+                else:
+                    values = self.serializer.loads(file.read())
+        except FileNotFoundError:
+            self._signature = None
+            values = {}
+        self._apply({k: v for k, v in values.items() if k in self.fields}, load=True)
+        self._dirty.difference_update(values)
+        return values
+
+    def _file_signature(self, fd: typing.Optional[int] = None) -> typing.Optional[typing.Tuple[int, ...]]:
+        """Build a cheap signature of config file, used to know if it changed since last load"""
+        if self.store is not None:
+            # Changes when another process writes in store
+            return self.store.version(),
+        try:
+            stat = os.fstat(fd) if fd is not None else os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
     def __getitem__(self, item: str) -> typing.Any:
         """
         Get field from config
 
+        Value is read from memory, config file is only parsed again if it changed on disk (checked here only if
+        :attr:`auto_reload` is set), and never written.
+
         :param str item: Config field to get
 
         Basic usage:
@@ -127,7 +464,8 @@ class Config:
         >>> print(config["my_parameter"]) #doctest: +SKIP
         3
         """
-        self.load()
+        if self.auto_reload:
+            self.refresh()
         return self.fields[item].get()
 
     def __str__(self):
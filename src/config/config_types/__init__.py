@@ -1,7 +1,9 @@
+import builtins
+import weakref
 from typing import Type
 
 from . import discord_types
-from .base_type import BaseType
+from .base_type import BaseType, Compiled, compile_type
 from .bool import Bool
 from .color import Color
 from .dict import Dict
@@ -10,7 +12,7 @@ from .int import Int
 from .list import List
 from .str import Str
 
-__all__ = ['factory', 'Dict', 'Float', 'Int', 'List', 'Str', 'discord_types', 'Bool', 'Color']
+__all__ = ['factory', 'compile_type', 'Compiled', 'Dict', 'Float', 'Int', 'List', 'Str', 'discord_types', 'Bool', 'Color']
 
 
 class Meta(type):
@@ -21,22 +23,43 @@ class Meta(type):
             return super(Meta, cls).__repr__()
 
 
+_factory_types = weakref.WeakValueDictionary()
+
+
 def factory(type: Type[BaseType], *args, **kwargs):
     """
     Create a new ``type`` with parameters args and kwargs
 
+    Types are interned: calls with equal parameters return the same type.
+
     :Basic usage:
 
     >>> factory(Int)
     <config_types.Int with parameters () {}>
     >>> factory(Int, min=0, max=10)
     <config_types.Int with parameters () {'min': 0, 'max': 10}>
+    >>> factory(Int, min=0, max=10) is factory(Int, max=10, min=0)
+    True
+    >>> factory(Int, values=[2, 3]) is factory(Int, values=[2, 3])
+    True
 
     :param Type[BaseType] type: Type to create
     :return: New type
     """
+    try:
+        key = (type, _freeze(args), _freeze(kwargs))
+        hash(key)
+    except TypeError:
+        # Unhashable parameter, type can't be shared
+        key = None
+    if key is not None:
+        existing_type = _factory_types.get(key)
+        if existing_type is not None:
+            return existing_type
 
     class Type(type, metaclass=Meta):
+        # All instances share the same parameters, so they can share compiled functions
+        _factory_type = True
 
         def __init__(self):
             super().__init__(*args, **kwargs)
@@ -45,4 +68,19 @@ def factory(type: Type[BaseType], *args, **kwargs):
         def __class_repr__(cls):
             return f"<config_types.{cls.__base__.__name__} with parameters {args} {kwargs}>"
 
+    if key is not None:
+        _factory_types[key] = Type
     return Type
+
+
+def _freeze(value):
+    """Build a hashable key from factory parameters, equal for equal parameters"""
+    # Builtins are shadowed by submodules of this package
+    if isinstance(value, builtins.dict):
+        return builtins.dict, tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (builtins.list, tuple)):
+        return tuple, tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset, frozenset(_freeze(v) for v in value)
+    # Type is part of key so 1, 1.0 and True don't build the same type
+    return value.__class__, value
@@ -1,3 +1,18 @@
+import typing
+
+
+class Compiled(typing.NamedTuple):
+    """Flat functions working on raw values of a config type, built once per type by :func:`compile_type`"""
+    #: Check and convert a value given to ``set``, raise :class:`ValueError` if value is incorrect
+    convert: typing.Callable[[typing.Any], typing.Any]
+    #: Check and convert a serialized value, raise :class:`ValueError` if value is incorrect
+    load: typing.Callable[[typing.Any], typing.Any]
+    #: Build value returned by ``get`` from converted value, None if it is the converted value itself
+    get: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None
+    #: Build serializable data from converted value, None if it is the converted value itself
+    to_save: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None
+
+
 class BaseType:
     def check_value(self, value):
         """Check if value is good"""
@@ -18,3 +33,71 @@ class BaseType:
     def load(self, value):
         """Fill with value"""
         pass
+
+    def compile(self) -> Compiled:
+        """
+        Build functions checking and converting values with parameters of this instance
+
+        Default implementation stores one instance of this type per value, types should override it to work on raw
+        values.
+        """
+        type_ = type(self)
+
+        def convert(value):
+            new_object = type_()
+            new_object.set(value)
+            return new_object
+
+        def load(value):
+            new_object = type_()
+            new_object.load(value)
+            return new_object
+
+        return Compiled(convert, load, type_.get, type_.to_save)
+
+    @property
+    def compiled(self) -> Compiled:
+        """Compiled functions for parameters of this instance, shared by all instances of a ``factory`` type"""
+        compiled = self.__dict__.get("_compiled")
+        if compiled is None:
+            if getattr(type(self), "_factory_type", False):
+                compiled = compile_type(type(self))
+            else:
+                compiled = self.compile()
+            self._compiled = compiled
+        return compiled
+
+    def _is_valid(self, value) -> bool:
+        try:
+            self.compiled.convert(value)
+        except ValueError:
+            return False
+        return True
+
+
+def compile_type(type_: typing.Type[BaseType]) -> Compiled:
+    """
+    Get compiled functions of a type created by ``factory``, compiled only once per type
+
+    Compiled functions are stored on the type itself, so they are released with it.
+
+    :Basic usage:
+
+    >>> from config.config_types import factory, Int
+    >>> compiled = compile_type(factory(Int, min=0))
+    >>> compiled.convert("3")
+    3
+    >>> compiled.convert(-3) # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ValueError: ...
+
+    :param typing.Type[BaseType] type_: Type to compile
+    :return: Compiled functions
+    :rtype: Compiled
+    """
+    # Look in own namespace only, subclasses have other parameters
+    compiled = type_.__dict__.get("_compiled_type")
+    if compiled is None:
+        compiled = type_().compile()
+        type_._compiled_type = compiled
+    return compiled
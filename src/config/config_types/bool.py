@@ -1,6 +1,6 @@
 import typing
 
-from .base_type import BaseType
+from .base_type import BaseType, Compiled
 
 
 class Bool(BaseType):
@@ -54,11 +54,7 @@ class Bool(BaseType):
         :return: True if value is correct
         :rtype: bool
         """
-        try:
-            bool(value)
-        except ValueError:
-            return False
-        return True
+        return self._is_valid(value)
 
     def set(self, value: bool) -> None:
         """
@@ -71,9 +67,7 @@ class Bool(BaseType):
 
         :param bool value: Value to set
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to set incompatible value.")
-        self.value = bool(value)
+        self.value = self.compiled.convert(value)
 
     def get(self) -> typing.Optional[bool]:
         """
@@ -119,9 +113,28 @@ class Bool(BaseType):
 
         :param bool value: Value to load
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to load incompatible value.")
-        self.value = value
+        self.value = self.compiled.load(value)
+
+    def compile(self) -> Compiled:
+        """
+        Build function checking and converting values in one pass
+
+        :Basic usage:
+
+        >>> Bool().compile().convert(34)
+        True
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+
+        def convert(value):
+            try:
+                return bool(value)
+            except ValueError:
+                raise ValueError(f"Attempt to set incompatible value {value!r}, bool required.") from None
+
+        return Compiled(convert, convert)
 
     def __repr__(self):
         return f'<config_types.Bool object with value {self.value}>'
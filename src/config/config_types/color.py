@@ -1,6 +1,6 @@
 import typing
 
-from .base_type import BaseType
+from .base_type import BaseType, Compiled
 
 
 class Color(BaseType):
@@ -44,11 +44,7 @@ class Color(BaseType):
         :return: True if value is correct
         :rtype: bool
         """
-        try:
-            int(value)
-        except ValueError:
-            return False
-        return 0xFFFFFF >= value >= 0x000000
+        return self._is_valid(value)
 
     def set(self, value: int) -> None:
         """
@@ -61,9 +57,7 @@ class Color(BaseType):
 
         :param int value: Value to set
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to set incompatible value.")
-        self.value = int(value)
+        self.value = self.compiled.convert(value)
 
     def get(self) -> typing.Optional[int]:
         """
@@ -110,9 +104,36 @@ class Color(BaseType):
 
         :param int value: Value to load
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to load incompatible value.")
-        self.value = value
+        self.value = self.compiled.load(value)
+
+    def compile(self) -> Compiled:
+        """
+        Build function checking and converting values in one pass
+
+        :Basic usage:
+
+        >>> Color().compile().convert(0xFF00FF)
+        16711935
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+
+        def convert(value):
+            try:
+                new_value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Attempt to set incompatible value {value!r}, color required.") from None
+            if not 0xFFFFFF >= new_value >= 0x000000:
+                raise ValueError(f"Attempt to set {new_value}, not a color.")
+            return new_value
+
+        def load(value):
+            # Saved value is kept as is
+            convert(value)
+            return value
+
+        return Compiled(convert, load)
 
     def __repr__(self):
         return f'<config_types.Color object with value {self.value}>'
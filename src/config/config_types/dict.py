@@ -1,6 +1,6 @@
 import typing
 
-from .base_type import BaseType
+from .base_type import BaseType, Compiled, compile_type
 
 
 class Dict(BaseType):
@@ -49,14 +49,7 @@ class Dict(BaseType):
         :return: True if value is correct
         :rtype: bool
         """
-        o_key = self.type_key()
-        o_value = self.type_value()
-        if type(value) == dict:
-            for k, v in value.items():
-                if not (o_key.check_value(k) and o_value.check_value(v)):
-                    return False
-            return True
-        return False
+        return self._is_valid(value)
 
     def set(self, value: typing.Dict[typing.Any, typing.Any]) -> None:
         """
@@ -74,16 +67,7 @@ class Dict(BaseType):
         :raise ValueError: if attempt to set invalid value
         :param typing.Dict[typing.Any, typing.Any] value: Value to set
         """
-        new_dict = dict()
-        if not self.check_value(value):
-            raise ValueError("Attempt to set incompatible value.")
-        for k, v in value.items():
-            new_key = self.type_key()
-            new_key.set(k)
-            new_value = self.type_value()
-            new_value.set(v)
-            new_dict.update({new_key: new_value})
-        self.values = new_dict
+        self.values = self.compiled.convert(value)
 
     def get(self) -> typing.Dict[typing.Any, typing.Any]:
         """
@@ -101,7 +85,7 @@ class Dict(BaseType):
         :rtype: typing.Dict[typing.Any, typing.Any]
         """
         if self.values is not None:
-            return {k.get(): v.get() for k, v in self.values.items()}
+            return self.compiled.get(self.values)
         return dict()
 
     def to_save(self) -> typing.List[typing.List[typing.Any]]:
@@ -119,7 +103,7 @@ class Dict(BaseType):
         """
         # Construction d'une liste de liste: [[key, value], ...]
         if self.values is not None:
-            return [[k.to_save(), v.to_save()] for k, v in self.values.items()]
+            return self.compiled.to_save(self.values)
         return list()
 
     def load(self, value: typing.List[typing.List[typing.Any]]) -> None:
@@ -136,14 +120,56 @@ class Dict(BaseType):
 
         :param typing.List[typing.List[typing.Any]] value:
         """
-        new_values = dict()
-        for v in value:
-            new_key = self.type_key()
-            new_key.load(v[0])
-            new_value = self.type_value()
-            new_value.load(v[1])
-            new_values.update({new_key: new_value})
-        self.values = new_values
+        self.values = self.compiled.load(value)
+
+    def compile(self) -> Compiled:
+        """
+        Build functions checking and converting whole dicts in one pass, without creating objects per item
+
+        :Basic usage:
+
+        >>> from config.config_types import factory, Int, Float
+        >>> Dict(factory(Int), factory(Float)).compile().load([["34", 1]])
+        {34: 1.0}
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+        convert_key, load_key, get_key, save_key = compile_type(self.type_key)
+        convert_value, load_value, get_value, save_value = compile_type(self.type_value)
+
+        def convert(value):
+            if type(value) != dict:
+                raise ValueError(f"Attempt to set incompatible value {value!r}, dict required.")
+            return {convert_key(k): convert_value(v) for k, v in value.items()}
+
+        def load(value):
+            try:
+                return {load_key(k): load_value(v) for k, v in value}
+            except TypeError:
+                raise ValueError(f"Attempt to load incompatible value {value!r}, list of pairs required.") from None
+
+        if get_key is None and get_value is None:
+            get = dict
+        else:
+            get_key = get_key or _identity
+            get_value = get_value or _identity
+
+            def get(values):
+                return {get_key(k): get_value(v) for k, v in values.items()}
+
+        save_key = save_key or _identity
+        save_value = save_value or _identity
+
+        def to_save(values):
+            # Saved as list of pairs, as keys are not always strings
+            return [[save_key(k), save_value(v)] for k, v in values.items()]
+
+        return Compiled(convert, load, get, to_save)
 
     def __repr__(self):
         return f'<config_types.Dict<{self.type_key}: {self.type_value}> object with value {self.values}>'
+
+
+def _identity(value):
+    return value
@@ -4,7 +4,7 @@ import typing
 
 import discord
 
-from config.config_types.base_type import BaseType
+from config.config_types.base_type import BaseType, Compiled
 
 if typing.TYPE_CHECKING:
     from bot_base import BotBase
@@ -51,15 +51,7 @@ class Channel(BaseType):
         :type value: Union[int, discord.TextChannel]
         :return: True if channel exists
         """
-        id = value
-        if isinstance(value, discord.TextChannel):
-            id = value.id
-        if not self.client.is_ready():
-            self.client.warning(f"No check for channel {value} because client is not initialized!")
-            return True
-        if self.client.get_channel(id):
-            return True
-        return True
+        return self._is_valid(value)
 
     def set(self, value: typing.Union[int, discord.TextChannel]):
         """
@@ -77,11 +69,7 @@ class Channel(BaseType):
         :param value: value to set
         :type value: Union[int, discord.TextChannel]
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to set incompatible value.")
-        if isinstance(value, discord.TextChannel):
-            value = value.id
-        self.value = value
+        self.value = self.compiled.convert(value)
         self._update()
 
     def get(self) -> typing.Union[int, discord.Channel]:
@@ -140,11 +128,42 @@ class Channel(BaseType):
         :param value: value to set
         :type value: Union[int, discord.TextChannel]
         """
-        if self.check_value(value):
-            raise ValueError("Attempt to load incompatible value.")
-        self.set(value)
+        self.value = self.compiled.load(value)
         self._update()
 
+    def compile(self) -> Compiled:
+        """
+        Build functions checking values and converting them to ids, and ids to channels
+
+        :Basic usage:
+
+        >>> Channel(client).compile().convert(valid_channel) #doctest: +SKIP
+        123412412421
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+        client = self.client
+        # Values are only reported once, before ready they would be on every config load
+        warned = False
+
+        def convert(value):
+            nonlocal warned
+            if isinstance(value, discord.TextChannel):
+                return value.id
+            if not warned and not client.is_ready():
+                warned = True
+                client.warning(f"No check for channel {value} because client is not initialized! "
+                               f"Other unchecked channels won't be reported.")
+            return value
+
+        def get(value):
+            if client.is_ready():
+                return client.get_channel(value) or value
+            return value
+
+        return Compiled(convert, convert, get)
+
     def _update(self):
         if self.client.is_ready() and self.channel_instance is None:
             self.channel_instance = self.client.get_channel(self.value)
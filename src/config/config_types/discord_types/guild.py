@@ -4,7 +4,7 @@ import typing
 
 import discord
 
-from config.config_types.base_type import BaseType
+from config.config_types.base_type import BaseType, Compiled
 
 if typing.TYPE_CHECKING:
     from bot_base import BotBase
@@ -52,15 +52,7 @@ class Guild(BaseType):
         :type value: Union[int, discord.Guild]
         :return: True if guild exists
         """
-        id = value
-        if isinstance(value, discord.Guild):
-            id = value.id
-        if not self.client.is_ready():
-            self.client.warning(f"No check for guild {value} because client is not initialized!")
-            return True
-        if self.client.get_guild(id):
-            return True
-        return True
+        return self._is_valid(value)
 
     def set(self, value: typing.Union[int, discord.Guild]) -> None:
         """
@@ -78,11 +70,7 @@ class Guild(BaseType):
         :param value: value to set
         :type value: Union[int, discord.Guild]
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to set incompatible value.")
-        if isinstance(value, discord.Guild):
-            value = value.id
-        self.value = value
+        self.value = self.compiled.convert(value)
         self._update()
 
     def get(self) -> typing.Union[int, discord.Guild]:
@@ -140,11 +128,42 @@ class Guild(BaseType):
         :param value: value to set
         :type value: Union[int, discord.Guild]
         """
-        if self.check_value(value):
-            raise ValueError("Attempt to load incompatible value.")
-        self.set(value)
+        self.value = self.compiled.load(value)
         self._update()
 
+    def compile(self) -> Compiled:
+        """
+        Build functions checking values and converting them to ids, and ids to guilds
+
+        :Basic usage:
+
+        >>> Guild(client).compile().convert(valid_guild) #doctest: +SKIP
+        123412412421
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+        client = self.client
+        # Values are only reported once, before ready they would be on every config load
+        warned = False
+
+        def convert(value):
+            nonlocal warned
+            if isinstance(value, discord.Guild):
+                return value.id
+            if not warned and not client.is_ready():
+                warned = True
+                client.warning(f"No check for guild {value} because client is not initialized! "
+                               f"Other unchecked guilds won't be reported.")
+            return value
+
+        def get(value):
+            if client.is_ready():
+                return client.get_guild(value) or value
+            return value
+
+        return Compiled(convert, convert, get)
+
     def __repr__(self):
         return f'<config_types.discord_types.Guild object with value {self.value}>'
 
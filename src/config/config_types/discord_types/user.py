@@ -3,7 +3,7 @@ import typing
 
 import discord
 
-from config.config_types.base_type import BaseType
+from config.config_types.base_type import BaseType, Compiled
 if typing.TYPE_CHECKING:
     from bot_base import BotBase
 
@@ -49,15 +49,7 @@ class User(BaseType):
         :type value: Union[int, discord.User]
         :return: True if user exists
         """
-        id = value
-        if isinstance(value, discord.User):
-            id = value.id
-        if not self.client.is_ready():
-            self.client.warning(f"No check for user {value} because client is not initialized!")
-            return True
-        if self.client.get_user(id):
-            return True
-        return True
+        return self._is_valid(value)
 
     def set(self, value: typing.Union[int, discord.User]) -> None:
         """
@@ -75,11 +67,7 @@ class User(BaseType):
         :param value: value to set
         :type value: Union[int, discord.User]
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to set incompatible value.")
-        if isinstance(value, discord.User):
-            value = value.id
-        self.value = value
+        self.value = self.compiled.convert(value)
         self._update()
 
     def get(self) -> typing.Union[int, discord.User]:
@@ -138,11 +126,42 @@ class User(BaseType):
         :param value: value to set
         :type value: Union[int, discord.User]
         """
-        if self.check_value(value):
-            raise ValueError("Attempt to load incompatible value.")
-        self.set(value)
+        self.value = self.compiled.load(value)
         self._update()
 
+    def compile(self) -> Compiled:
+        """
+        Build functions checking values and converting them to ids, and ids to users
+
+        :Basic usage:
+
+        >>> User(client).compile().convert(valid_user) #doctest: +SKIP
+        123412412421
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+        client = self.client
+        # Values are only reported once, before ready they would be on every config load
+        warned = False
+
+        def convert(value):
+            nonlocal warned
+            if isinstance(value, discord.User):
+                return value.id
+            if not warned and not client.is_ready():
+                warned = True
+                client.warning(f"No check for user {value} because client is not initialized! "
+                               f"Other unchecked users won't be reported.")
+            return value
+
+        def get(value):
+            if client.is_ready():
+                return client.get_user(value) or value
+            return value
+
+        return Compiled(convert, convert, get)
+
     def _update(self):
         if self.client.is_ready() and self.user_instance is None:
             self.user_instance = self.client.get_user(self.value)
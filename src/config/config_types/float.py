@@ -1,6 +1,6 @@
 import typing
 
-from .base_type import BaseType
+from .base_type import BaseType, Compiled
 
 
 class Float(BaseType):
@@ -71,16 +71,7 @@ class Float(BaseType):
         :return: True if value is correct
         :rtype: bool
         """
-        try:
-            float(value)
-        except ValueError:
-            return False
-        # Check min/max
-        if self.min is not None and float(value) < self.min:
-            return False
-        if self.max is not None and float(value) > self.max:
-            return False
-        return True
+        return self._is_valid(value)
 
     def set(self, value: float) -> None:
         """
@@ -97,9 +88,7 @@ class Float(BaseType):
         :raise ValueError: if attempt to set invalid value
         :param float value: Value to set
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to set incompatible value.")
-        self.value = float(value)
+        self.value = self.compiled.convert(value)
 
     def get(self) -> float:
         """
@@ -145,9 +134,34 @@ class Float(BaseType):
 
         :param float value: Value to load
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to load incompatible value.")
-        self.value = value
+        self.value = self.compiled.load(value)
+
+    def compile(self) -> Compiled:
+        """
+        Build function checking and converting values in one pass
+
+        :Basic usage:
+
+        >>> Float(min=0).compile().convert("0.5")
+        0.5
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+        min_, max_ = self.min, self.max
+
+        def convert(value):
+            try:
+                new_value = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Attempt to set incompatible value {value!r}, float required.") from None
+            if min_ is not None and new_value < min_:
+                raise ValueError(f"Attempt to set {new_value}, lower than {min_}.")
+            if max_ is not None and new_value > max_:
+                raise ValueError(f"Attempt to set {new_value}, greater than {max_}.")
+            return new_value
+
+        return Compiled(convert, convert)
 
     def __repr__(self):
         if self.min is not None or self.max is not None:
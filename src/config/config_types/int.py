@@ -1,6 +1,6 @@
 import typing
 
-from .base_type import BaseType
+from .base_type import BaseType, Compiled
 
 
 class Int(BaseType):
@@ -87,19 +87,7 @@ class Int(BaseType):
         :param int value: value to check
         :return bool: True if value is correct
         """
-        try:
-            int(value)
-        except ValueError:
-            return False
-        # Check min/max
-        if self.min is not None and int(value) < self.min:
-            return False
-        if self.max is not None and int(value) > self.max:
-            return False
-        # Check validity
-        if self.values is not None and value not in self.values:
-            return False
-        return True
+        return self._is_valid(value)
 
     def set(self, value: int) -> None:
         """
@@ -116,9 +104,7 @@ class Int(BaseType):
         :raise ValueError: if attempt to set invalid value
         :param int value: Value to set
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to set incompatible value.")
-        self.value = int(value)
+        self.value = self.compiled.convert(value)
 
     def get(self) -> typing.Optional[int]:
         """
@@ -164,9 +150,37 @@ class Int(BaseType):
 
         :param int value: Value to load
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to load incompatible value.")
-        self.value = value
+        self.value = self.compiled.load(value)
+
+    def compile(self) -> Compiled:
+        """
+        Build function checking and converting values in one pass
+
+        :Basic usage:
+
+        >>> Int(values=[2, 3, 5, 7]).compile().convert("5")
+        5
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+        min_, max_ = self.min, self.max
+        values = frozenset(self.values) if self.values is not None else None
+
+        def convert(value):
+            try:
+                new_value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Attempt to set incompatible value {value!r}, int required.") from None
+            if min_ is not None and new_value < min_:
+                raise ValueError(f"Attempt to set {new_value}, lower than {min_}.")
+            if max_ is not None and new_value > max_:
+                raise ValueError(f"Attempt to set {new_value}, greater than {max_}.")
+            if values is not None and new_value not in values:
+                raise ValueError(f"Attempt to set {new_value}, not in {sorted(values)}.")
+            return new_value
+
+        return Compiled(convert, convert)
 
     def __repr__(self):
         if self.min is not None or self.max is not None:
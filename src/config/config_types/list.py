@@ -1,11 +1,11 @@
 import typing
 
-from .base_type import BaseType
+from .base_type import BaseType, Compiled, compile_type
 
 
 class List(BaseType):
-    #: :class:`typing.List` [:class:`BaseType`]: Current list of value
-    values: typing.List[BaseType]
+    #: :class:`typing.List`: Current list of values, converted by type of items
+    values: typing.List[typing.Any]
     #: :class:`typing.Type` [:class:`BaseType`]: Type of values
     type_: typing.Type[BaseType]
 
@@ -45,14 +45,7 @@ class List(BaseType):
         :return: True if value is correct
         :rtype: bool
         """
-        new_object = self.type_()
-        try:
-            for v in value:
-                if not new_object.check_value(v):
-                    return False
-        except TypeError:
-            return False
-        return True
+        return self._is_valid(value)
 
     def set(self, value: typing.List[typing.Any]) -> None:
         """
@@ -69,14 +62,7 @@ class List(BaseType):
 
         :param typing.List[typing.Any] value: Value to set
         """
-        if not self.check_value(value):
-            raise ValueError('Attempt to set incompatible value.')
-        new_liste = []
-        for v in value:
-            new_element = self.type_()
-            new_element.set(v)
-            new_liste.append(new_element)
-        self.values = new_liste
+        self.values = self.compiled.convert(value)
 
     def get(self) -> typing.List[typing.Any]:
         """
@@ -94,7 +80,7 @@ class List(BaseType):
         :return: Value of parameter
         :rtype: typing.List[typing.Any]
         """
-        return [v.get() for v in self.values]
+        return self.compiled.get(self.values)
 
     def to_save(self) -> typing.List[typing.Any]:
         """
@@ -113,7 +99,7 @@ class List(BaseType):
         :return: Current value
         :rtype: typing.List[typing.Any]
         """
-        return [v.to_save() for v in self.values]
+        return self.compiled.to_save(self.values)
 
     def load(self, value: typing.List[typing.Any]) -> None:
         """
@@ -127,12 +113,39 @@ class List(BaseType):
 
         :param typing.List[typing.Any] value: Value to load
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to load incompatible value.")
-        for v in value:
-            new_object = self.type_()
-            new_object.load(v)
-            self.values.append(new_object)
+        self.values = self.compiled.load(value)
+
+    def compile(self) -> Compiled:
+        """
+        Build functions checking and converting whole lists in one pass, without creating an object per item
+
+        :Basic usage:
+
+        >>> from config.config_types import factory, Int
+        >>> List(factory(Int, min=0)).compile().convert(["1", 2])
+        [1, 2]
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+        convert_item, load_item, get_item, save_item = compile_type(self.type_)
+
+        def convert(value):
+            try:
+                return [convert_item(v) for v in value]
+            except TypeError:
+                raise ValueError(f"Attempt to set incompatible value {value!r}, list required.") from None
+
+        def load(value):
+            try:
+                return [load_item(v) for v in value]
+            except TypeError:
+                raise ValueError(f"Attempt to load incompatible value {value!r}, list required.") from None
+
+        # Always build a new list, so stored values can't be modified from outside
+        get = list if get_item is None else lambda values: [get_item(v) for v in values]
+        to_save = list if save_item is None else lambda values: [save_item(v) for v in values]
+        return Compiled(convert, load, get, to_save)
 
     def __repr__(self):
         return f'<config_types.List of {self.type_} objects with values {self.values}>'
@@ -1,4 +1,4 @@
-from .base_type import BaseType
+from .base_type import BaseType, Compiled
 
 
 class Str(BaseType):
@@ -31,11 +31,7 @@ class Str(BaseType):
         :param str value: Value to test
         :return: True if value is usable as str
         """
-        try:
-            str(value)
-        except ValueError:
-            return False
-        return True
+        return self._is_valid(value)
 
     def set(self, value: str) -> None:
         """
@@ -50,9 +46,7 @@ class Str(BaseType):
         :raise ValueError: if attempt to set invalid value
         :param str value: Value to set
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to set incompatible value.")
-        self.value = str(value)
+        self.value = self.compiled.convert(value)
 
     def get(self) -> str:
         """
@@ -101,9 +95,28 @@ class Str(BaseType):
         >>> my_str.get()
         '34'
         """
-        if not self.check_value(value):
-            raise ValueError("Attempt to load incompatible value.")
-        self.value = value
+        self.value = self.compiled.load(value)
+
+    def compile(self) -> Compiled:
+        """
+        Build function checking and converting values in one pass
+
+        :Basic usage:
+
+        >>> Str().compile().convert(34)
+        '34'
+
+        :return: Compiled functions
+        :rtype: Compiled
+        """
+
+        def convert(value):
+            try:
+                return str(value)
+            except ValueError:
+                raise ValueError(f"Attempt to set incompatible value {value!r}, str required.") from None
+
+        return Compiled(convert, convert)
 
     def __repr__(self):
         return f'<config_types.Str object with value "{self.value}">'
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import marshal
+import os
+import typing
+
+import toml
+
+from utils import files
+
+
+class Serializer:
+    """Base class for config file formats"""
+
+    def dumps(self, data: typing.Dict[str, typing.Any]) -> bytes:
+        """Build file content from data"""
+        raise NotImplementedError
+
+    def loads(self, content: bytes) -> typing.Dict[str, typing.Any]:
+        """Build data from file content"""
+        raise NotImplementedError
+
+
+class TomlSerializer(Serializer):
+    def dumps(self, data: typing.Dict[str, typing.Any]) -> bytes:
+        """
+        Build TOML file content
+
+        :Basic usage:
+
+        >>> TomlSerializer().dumps({"a": [1, 2]})
+        b'a = [ 1, 2,]\\n'
+
+        :param typing.Dict[str, typing.Any] data: Data to serialize
+        :return: File content
+        :rtype: bytes
+        """
+        return toml.dumps(data).encode("utf-8")
+
+    def loads(self, content: bytes) -> typing.Dict[str, typing.Any]:
+        """
+        Read TOML file content
+
+        :Basic usage:
+
+        >>> TomlSerializer().loads(b"a = [ 1, 2,]")
+        {'a': [1, 2]}
+
+        :param bytes content: File content
+        :return: Data
+        :rtype: typing.Dict[str, typing.Any]
+        """
+        return toml.loads(content.decode("utf-8"))
+
+
+class JsonSerializer(Serializer):
+    def dumps(self, data: typing.Dict[str, typing.Any]) -> bytes:
+        """
+        Build JSON file content
+
+        :Basic usage:
+
+        >>> JsonSerializer().dumps({"a": [1, 2]})
+        b'{\\n    "a": [\\n        1,\\n        2\\n    ]\\n}'
+
+        :param typing.Dict[str, typing.Any] data: Data to serialize
+        :return: File content
+        :rtype: bytes
+        """
+        return json.dumps(data, indent=4).encode("utf-8")
+
+    def loads(self, content: bytes) -> typing.Dict[str, typing.Any]:
+        """
+        Read JSON file content
+
+        :Basic usage:
+
+        >>> JsonSerializer().loads(b'{"a": [1, 2]}')
+        {'a': [1, 2]}
+
+        :param bytes content: File content
+        :return: Data
+        :rtype: typing.Dict[str, typing.Any]
+        """
+        return json.loads(content.decode("utf-8"))
+
+
+class BinaryCache:
+    #: :class:`int`: Format version of cache files, cache files of other versions are ignored
+    VERSION = 1
+
+    def __init__(self, path: str) -> None:
+        """
+        Compact binary copy of a config file, next to it
+
+        Cache is keyed by modification time, size and hash of config file: it is used directly if file wasn't
+        modified, and after checking hash if it was only touched.
+
+        :Basic usage:
+
+        >>> cache = BinaryCache("doctest_config.toml")
+        >>> cache.path
+        '.doctest_config.toml.cache'
+
+        :param str path: Path of config file
+        """
+        directory, name = os.path.split(path)
+        #: :class:`str`: Path of cache file
+        self.path = os.path.join(directory, f".{name}.cache")
+
+    @staticmethod
+    def digest(content: bytes) -> bytes:
+        """Hash content of config file"""
+        return hashlib.blake2b(content, digest_size=16).digest()
+
+    def load(self, file: typing.BinaryIO, key: typing.Tuple[int, ...],
+             loads: typing.Callable[[bytes], typing.Dict[str, typing.Any]]) -> typing.Dict[str, typing.Any]:
+        """
+        Read config file, using cached data if it is fresh, and update cache
+
+        :param typing.BinaryIO file: Config file
+        :param typing.Tuple[int, ...] key: Inode, size and modification time of config file
+        :param loads: Function parsing config file content
+        :return: Data of config file
+        :rtype: typing.Dict[str, typing.Any]
+        """
+        try:
+            with open(self.path, "rb") as cache_file:
+                version, cached_key, cached_digest, cached_data = marshal.load(cache_file)
+        except (OSError, EOFError, ValueError, TypeError):
+            version = None
+        if version == self.VERSION and cached_key == key:
+            return cached_data
+        content = file.read()
+        digest = self.digest(content)
+        if version == self.VERSION and cached_digest == digest:
+            # File was only touched
+            data = cached_data
+        else:
+            data = loads(content)
+        self._write(key, digest, data)
+        return data
+
+    def store(self, key: typing.Tuple[int, ...], content: bytes, data: typing.Dict[str, typing.Any]) -> None:
+        """
+        Write cache of config file
+
+        :param typing.Tuple[int, ...] key: Inode, size and modification time of config file
+        :param bytes content: Content of config file
+        :param typing.Dict[str, typing.Any] data: Data of config file
+        """
+        self._write(key, self.digest(content), data)
+
+    def _write(self, key: typing.Tuple[int, ...], digest: bytes, data: typing.Dict[str, typing.Any]) -> None:
+        try:
+            cache = marshal.dumps((self.VERSION, key, digest, data))
+        except ValueError:
+            # Data contains types unsupported by marshal (e.g. TOML dates)
+            return
+        # Cache can be rebuilt, no need to sync it
+        files.atomic_write({self.path: cache}, fsync=False)
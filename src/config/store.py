@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+import typing
+
+
+class ConfigStore:
+    #: :class:`str`: Path of database
+    path: str
+
+    def __init__(self, path: str) -> None:
+        """
+        Single SQLite database holding many configs, one row per field
+
+        Database uses WAL mode, so reads don't block writes, and updating a field only rewrites its row.
+
+        :Basic usage:
+
+        >>> store = ConfigStore(":memory:")
+        >>> store.save("my_config", {"my_parameter": 3})
+        >>> store.load("my_config")
+        {'my_parameter': 3}
+        >>> store.close()
+
+        :param str path: Path of database
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Transactions are handled explicitly
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS fields ("
+                                "config TEXT NOT NULL, "
+                                "name TEXT NOT NULL, "
+                                "value TEXT NOT NULL, "
+                                "PRIMARY KEY (config, name)"
+                                ") WITHOUT ROWID")
+
+    def load(self, config: str) -> typing.Dict[str, typing.Any]:
+        """
+        Get all fields of a config
+
+        :param str config: Name of config
+        :return: Serialized fields values
+        :rtype: typing.Dict[str, typing.Any]
+        """
+        rows = self.connection.execute("SELECT name, value FROM fields WHERE config = ?", (config,))
+        return {name: json.loads(value) for name, value in rows}
+
+    def save(self, config: str, values: typing.Dict[str, typing.Any]) -> None:
+        """
+        Write fields of a config, other fields are kept
+
+        :param str config: Name of config
+        :param typing.Dict[str, typing.Any] values: Serialized fields values
+        """
+        self.save_many({config: values})
+
+    def save_many(self, configs: typing.Dict[str, typing.Dict[str, typing.Any]]) -> None:
+        """
+        Write fields of several configs in one transaction
+
+        :param typing.Dict[str, typing.Dict[str, typing.Any]] configs: Serialized fields values, by config name
+        """
+        rows = [(config, name, json.dumps(value, separators=(",", ":")))
+                for config, values in configs.items()
+                for name, value in values.items()]
+        if not rows:
+            return
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany("INSERT OR REPLACE INTO fields (config, name, value) VALUES (?, ?, ?)", rows)
+
+    def version(self) -> int:
+        """
+        Get a number which changes each time another connection modifies database
+
+        :return: Data version of database
+        :rtype: int
+        """
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close database
+        """
+        self.connection.close()
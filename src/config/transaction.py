@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import typing
+
+if typing.TYPE_CHECKING:
+    from config.base import Config
+
+
+class Transaction:
+    #: :class:`Config`: Config updated by transaction
+    config: Config
+    #: :class:`typing.Dict` [:class:`str`, :class:`typing.Any`]: Values set during transaction
+    values: typing.Dict[str, typing.Any]
+
+    def __init__(self, config: Config) -> None:
+        """
+        Group several :meth:`Config.set` calls
+
+        Values are checked together and applied at exit, followed by a single save and a single change
+        notification. If a value is incorrect or a field doesn't exist, nothing is applied.
+
+        Use :meth:`Config.transaction` to create it.
+
+        :param Config config: Config to update
+        """
+        self.config = config
+        self.values = {}
+        self._no_save = True
+        # Transaction which was open when this one started, and the one values are given to if it is nested
+        self._previous = None
+        self._parent = None
+        # Task which opened transaction with ``async with``, None if any code can add values
+        self._owner = None
+        self._locked = False
+
+    def set(self, values: typing.Dict[str, typing.Any], no_save: bool = False) -> None:
+        """
+        Add values to transaction
+
+        :param typing.Dict[str, typing.Any] values: dict of parameters
+        :param bool no_save: Don't save config at exit, unless another call requires it
+        """
+        self.values.update(values)
+        self._no_save = self._no_save and no_save
+
+    def commit(self) -> None:
+        """
+        Check and apply all values, then save config
+
+        :raise KeyError: if a field doesn't exist
+        :raise ValueError: if a value is incorrect
+        """
+        values, self.values = self.values, {}
+        if self._parent is not None:
+            # Nested transaction, values are applied with outer one
+            self._parent.set(values, no_save=self._no_save)
+            return
+        self.config._apply(values)
+        if not self._no_save:
+            self.config.save()
+
+    def __enter__(self) -> Transaction:
+        self._previous = self.config._transaction
+        # Transaction of another task is not a parent
+        self._parent = self._previous if self.config._owns_transaction() else None
+        self.config._transaction = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.config._transaction = self._previous
+        if exc_type is None:
+            self.commit()
+
+    async def __aenter__(self) -> Transaction:
+        # Coroutines updating the same config wait for each other, nested transactions don't wait
+        task = asyncio.current_task()
+        if self.config._transaction_owner is not task:
+            await self.config._transaction_lock.acquire()
+            self.config._transaction_owner = task
+            self._locked = True
+        self._owner = task
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        try:
+            self.__exit__(exc_type, exc_val, exc_tb)
+        finally:
+            if self._locked:
+                self._locked = False
+                self.config._transaction_owner = None
+                self.config._transaction_lock.release()
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+import typing
+
+if typing.TYPE_CHECKING:
+    from config.base import Config
+
+# inotify constants, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_IGNORED = 0x00008000
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_libc() -> typing.Optional[ctypes.CDLL]:
+    """Get libc if it supports inotify"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class ConfigWatcher:
+    #: :class:`float`: Time (in seconds) between two checks when polling
+    interval: float
+    #: :class:`typing.Dict` [:class:`str`, :class:`typing.List` [:class:`Config`]]: Watched configs, by absolute path
+    configs: typing.Dict[str, typing.List[Config]]
+
+    def __init__(self, interval: float = 1., use_inotify: bool = True) -> None:
+        """
+        Reload configs in background when their file change
+
+        Use inotify on Linux, and poll files each ``interval`` seconds elsewhere. While watcher is running, watched
+        configs don't check their file on each read.
+
+        Basic usage:
+
+        >>> from config import Config
+        >>> watcher = ConfigWatcher()
+        >>> watcher.watch(Config("doctest_config.toml"))
+        >>> watcher.start() #doctest: +SKIP
+
+        :param float interval: Time between two checks when polling
+        :param bool use_inotify: Use inotify if available
+        """
+        self.interval = interval
+        self.configs = {}
+        self.log = logging.getLogger("bot_base.config")
+        self._libc = _load_libc() if use_inotify else None
+        self._fd = None
+        self._loop = None
+        self._task = None
+        # inotify watch descriptors, by directory and directory by watch descriptor
+        self._watches = {}
+        self._directories = {}
+
+    @property
+    def running(self) -> bool:
+        """Check if watcher is running"""
+        return self._loop is not None
+
+    def watch(self, config: Config) -> None:
+        """
+        Watch file of ``config``
+
+        :param Config config: Config to watch
+        """
+        if config.path is None:
+            return
+        path = os.path.abspath(config.path)
+        configs = self.configs.setdefault(path, [])
+        if config not in configs:
+            configs.append(config)
+        if self.running:
+            self._add_watch(os.path.dirname(path))
+            config.auto_reload = False
+            config.refresh()
+
+    def unwatch(self, config: Config) -> None:
+        """
+        Stop watching file of ``config``
+
+        :param Config config: Config to stop watching
+        """
+        if config.path is None:
+            return
+        configs = self.configs.get(os.path.abspath(config.path), [])
+        if config in configs:
+            configs.remove(config)
+            config.auto_reload = True
+
+    def start(self) -> None:
+        """
+        Start watching files, must be called from a running event loop
+        """
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                self.log.warning(f"inotify unavailable ({os.strerror(ctypes.get_errno())}), polling config files.")
+            else:
+                self._fd = fd
+                self._loop.add_reader(fd, self._read_events)
+        if self._fd is None:
+            self._task = self._loop.create_task(self._poll())
+        for path, configs in self.configs.items():
+            self._add_watch(os.path.dirname(path))
+            for config in configs:
+                config.auto_reload = False
+        # Catch changes made before watches were added
+        self.refresh()
+
+    def stop(self) -> None:
+        """
+        Stop watching files, configs check their file on each read again
+        """
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._watches.clear()
+        self._directories.clear()
+        self._loop = None
+        for configs in self.configs.values():
+            for config in configs:
+                config.auto_reload = True
+
+    def refresh(self, path: typing.Optional[str] = None) -> None:
+        """
+        Reload configs whose file changed
+
+        :param typing.Optional[str] path: Only reload configs of this file
+        """
+        paths = self.configs.keys() if path is None else [path]
+        for path in list(paths):
+            for config in self.configs.get(path, []):
+                try:
+                    if config.refresh():
+                        self.log.info(f"Config {config.path} reloaded.")
+                except Exception as e:
+                    # Keep old values if operator saved an invalid file
+                    self.log.error(f"Unable to reload config {config.path}: {e!r}")
+
+    def _add_watch(self, directory: str) -> None:
+        if self._fd is None or directory in self._watches:
+            return
+        os.makedirs(directory, exist_ok=True)
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            self.log.warning(f"Unable to watch {directory}: {os.strerror(ctypes.get_errno())}")
+            return
+        self._watches[directory] = wd
+        self._directories[wd] = directory
+
+    def _read_events(self) -> None:
+        changed = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif mask & IN_IGNORED:
+                    # Directory was removed, forget its watch
+                    directory = self._directories.pop(wd, None)
+                    self._watches.pop(directory, None)
+                elif wd in self._directories:
+                    changed.add(os.path.join(self._directories[wd], name))
+        if overflow:
+            self.refresh()
+            return
+        for path in changed:
+            if path in self.configs:
+                self.refresh(path)
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.refresh()
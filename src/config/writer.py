@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import traceback
+import typing
+
+from config.base import Config
+
+
+class ConfigWriter:
+    #: :class:`float`: Time (in seconds) to wait after first change before writing dirty configs
+    delay: float
+    #: :class:`int`: Number of pending changes which triggers an immediate write
+    max_pending: int
+    #: :class:`typing.Dict` [:class:`Config`, :class:`None`]: Configs waiting to be written, in order of first change
+    dirty: typing.Dict[Config, None]
+
+    def __init__(self, delay: float = 1., max_pending: int = 32,
+                 on_error: typing.Optional[typing.Callable[[str], typing.Any]] = None) -> None:
+        """
+        Write-behind engine for configs
+
+        Configs created with a writer don't write their file on each :meth:`Config.save`, they are marked dirty and
+        written at most ``delay`` seconds later, so a burst of changes costs one write per config.
+
+        If no event loop is running, configs are written immediately. If a write fails, configs stay dirty and are
+        written by next flush.
+
+        Basic usage:
+
+        >>> from config import Config
+        >>> from config.config_types import factory, Int
+        >>> writer = ConfigWriter(delay=5)
+        >>> config = Config("doctest_config.toml", writer=writer)
+        >>> config.register("my_parameter", factory(Int))
+        >>> config.set({"my_parameter": 3}) #doctest: +SKIP
+        >>> writer.flush() #doctest: +SKIP
+
+        Failed writes are retried:
+
+        >>> import os, tempfile
+        >>> folder = tempfile.mkdtemp()
+        >>> open(os.path.join(folder, "blocker"), "w").close()
+        >>> writer = ConfigWriter(on_error=lambda message: print(message.splitlines()[0]))
+        >>> config = Config(os.path.join(folder, "blocker", "config.toml"), writer=writer)
+        >>> config.register("my_parameter", factory(Int))
+        >>> try:
+        ...     config.set({"my_parameter": 3})
+        ... except OSError:
+        ...     print("failed")
+        Unable to write configs, they are written on next flush:
+        failed
+        >>> len(writer.dirty)
+        1
+        >>> os.remove(os.path.join(folder, "blocker"))
+        >>> writer.flush()
+        >>> len(writer.dirty), os.path.isfile(os.path.join(folder, "blocker", "config.toml"))
+        (0, True)
+
+        :param float delay: Time to wait after first change before writing dirty configs
+        :param int max_pending: Number of pending changes which triggers an immediate write
+        :param on_error: Function called with error message when a write fails, error is logged by default
+        """
+        self.delay = delay
+        self.max_pending = max_pending
+        self.on_error = on_error if on_error is not None else logging.getLogger(__name__).error
+        self.dirty = {}
+        self._pending = 0
+        self._task = None
+
+    def mark_dirty(self, config: Config) -> None:
+        """
+        Schedule write of ``config``
+
+        :param Config config: Config to write
+        """
+        self.dirty[config] = None
+        self._pending += 1
+        if self._pending >= self.max_pending:
+            self.flush()
+            return
+        if self._task is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+                return
+            self._task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.delay)
+        self._task = None
+        try:
+            self.flush()
+        except Exception:
+            # Already reported, configs are written on next flush
+            pass
+
+    def flush(self) -> None:
+        """
+        Write all dirty configs now, with a single sync to disk
+
+        :raise Exception: error of write, configs stay dirty
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        dirty, pending = self.dirty, self._pending
+        self.dirty, self._pending = {}, 0
+        try:
+            Config.write_all(dirty)
+        except Exception:
+            # Configs changed meanwhile stay after them
+            self.dirty = {**dirty, **self.dirty}
+            self._pending += pending
+            self.on_error(f"Unable to write configs, they are written on next flush:\n{traceback.format_exc()}")
+            raise
@@ -16,3 +16,7 @@ class IncompatibleModuleError(ModuleException):
 
 class MissingDependency(ModuleException):
     pass
+
+
+class DependencyCycle(ModuleException):
+    pass
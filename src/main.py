@@ -5,6 +5,7 @@ import logging
 import os
 
 from bot_base.bot_base import BotBase
+from bot_base.sharding import Supervisor
 
 
 def setup_logging(default_path='data/log_config.json', default_level=logging.INFO, env_key='BOT_BASE_LOG_CONFIG'):
@@ -25,6 +26,14 @@ def setup_logging(default_path='data/log_config.json', default_level=logging.INF
 def main():
     setup_logging()
     print(os.environ.get("LOCAL_MODULES", "modules"))
+    shard_count = int(os.environ.get("BOT_SHARDS", 0))
+    if shard_count:
+        # Sharded mode: BOT_PROCESSES workers run shards, supervisor restarts them if they crash
+        processes = int(os.environ.get("BOT_PROCESSES", os.cpu_count() or 1))
+        supervisor = Supervisor(os.environ.get("DISCORD_TOKEN"), shard_count, processes, setup=setup_logging,
+                                max_messages=500000, data_folder="datas")
+        supervisor.run()
+        return
     client = BotBase(max_messages=500000, data_folder="datas")
 
     async def start_bot():
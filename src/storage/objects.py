@@ -1,19 +1,35 @@
 import json
 import os
 
+from utils import files
 from . import jsonencoder
 
 
 class Objects:
-    def __init__(self, path: str):
+    def __init__(self, path: str, shared: bool = False):
+        """
+        Store objects as json files
+
+        :param str path: Folder of ``objects`` folder
+        :param bool shared: Files are also written by other processes (e.g. shards of a
+            :class:`bot_base.sharding.Supervisor`), they are locked and synced to disk while they are written
+        """
         self.path = os.path.abspath(path)
+        self.shared = shared
         os.makedirs(os.path.join(self.path, "objects"), exist_ok=True)
         self.encoder = jsonencoder.Encoder()
 
     def save_object(self, object_name, object_instance):
-        """Save object into json file"""
-        with open(os.path.join(self.path, "objects", object_name + ".json"), "w") as file:
-            json.dump(object_instance, file, cls=self.encoder.JSONEncoder)
+        """Save object into json file, replaced atomically, and locked against other processes if shared"""
+        path = os.path.join(self.path, "objects", object_name + ".json")
+        content = json.dumps(object_instance, cls=self.encoder.JSONEncoder)
+        if self.shared:
+            with files.locked([path]):
+                files.atomic_write({path: content})
+            return
+        # Synced in background, so event loop isn't blocked
+        files.atomic_write({path: content}, fsync=False)
+        files.deferred_sync.add([path])
 
     def load_object(self, object_name):
         """Load object from json file"""
@@ -1,3 +1,4 @@
 from . import emojis
+from . import files
 
-__all__ = ["emojis"]
+__all__ = ["emojis", "files"]
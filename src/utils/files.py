@@ -0,0 +1,188 @@
+import atexit
+import contextlib
+import os
+import stat
+import tempfile
+import threading
+import typing
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, files are not locked
+    fcntl = None
+
+
+def atomic_write(files: typing.Dict[str, typing.Union[str, bytes]], fsync: bool = True) -> None:
+    """
+    Replace content of files atomically
+
+    Each file is written to a temporary file in the same directory, then renamed over the target, so a reader (or a
+    crash) never sees a truncated file. All temporary files are written before they are synced, and each directory is
+    synced only once, so writing many files costs about one sync.
+
+    :Basic usage:
+
+    >>> atomic_write({"doctest_file.toml": "a = 1\\n"}) #doctest: +SKIP
+
+    :param typing.Dict[str, typing.Union[str, bytes]] files: Content to write, by path
+    :param bool fsync: Sync files and directories to disk before returning
+    """
+    temporary_files = {}
+    try:
+        for path, content in files.items():
+            directory = os.path.dirname(path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+            temporary_files[temporary_path] = path
+            with open(fd, "wb" if isinstance(content, bytes) else "w") as file:
+                file.write(content)
+            try:
+                os.chmod(temporary_path, stat.S_IMODE(os.stat(path).st_mode))
+            except FileNotFoundError:
+                os.chmod(temporary_path, 0o644)
+        if fsync:
+            for temporary_path in temporary_files:
+                _fsync_path(temporary_path, os.O_RDWR)
+        for temporary_path, path in list(temporary_files.items()):
+            os.replace(temporary_path, path)
+            del temporary_files[temporary_path]
+        if fsync:
+            for directory in {os.path.dirname(path) or "." for path in files}:
+                _fsync_path(directory, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    finally:
+        # Don't leave temporary files behind on error
+        for temporary_path in temporary_files:
+            try:
+                os.remove(temporary_path)
+            except FileNotFoundError:
+                pass
+
+
+def _fsync_path(path: str, flags: int) -> None:
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        # Directories can't be opened on some platforms (Windows)
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SyncCollector:
+    #: :class:`float`: Time (in seconds) to wait after first write before syncing written files
+    delay: float
+
+    def __init__(self, delay: float = 1.) -> None:
+        """
+        Sync written files to disk later, in a background thread, with one sync per file and directory for a burst of
+        writes
+
+        Files written with :func:`atomic_write` and ``fsync=False`` are already replaced atomically, so readers never
+        see them half-written, only durability after a crash is delayed.
+
+        :Basic usage:
+
+        >>> collector = SyncCollector(delay=60)
+        >>> collector.add(["doctest_missing_file.toml"])
+        >>> collector.pending
+        1
+        >>> collector.flush()
+        >>> collector.pending
+        0
+
+        :param float delay: Time to wait after first write before syncing written files
+        """
+        self.delay = delay
+        self._paths = set()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def pending(self) -> int:
+        """Number of files waiting to be synced"""
+        return len(self._paths)
+
+    def add(self, paths: typing.Iterable[str]) -> None:
+        """
+        Schedule sync of files and their directories
+
+        :param typing.Iterable[str] paths: Paths of written files
+        """
+        with self._lock:
+            self._paths.update(paths)
+            if self._timer is None and self._paths:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """
+        Sync pending files and their directories now
+        """
+        with self._lock:
+            paths, self._paths = self._paths, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for path in paths:
+            _fsync_path(path, os.O_RDONLY)
+        for directory in {os.path.dirname(path) or "." for path in paths}:
+            _fsync_path(directory, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+
+
+#: :class:`SyncCollector`: Collector of files written without immediate sync, flushed at exit
+deferred_sync = SyncCollector()
+atexit.register(deferred_sync.flush)
+
+
+def lock_path(path: str) -> str:
+    """
+    Get path of lock file of ``path``
+
+    :Basic usage:
+
+    >>> lock_path(os.path.join("data", "config.toml")) == os.path.join("data", ".config.toml.lock")
+    True
+
+    :param str path: Path of locked file
+    :return: Path of lock file, next to locked file
+    :rtype: str
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.lock")
+
+
+@contextlib.contextmanager
+def locked(paths: typing.Iterable[str], shared: bool = False) -> typing.Iterator[None]:
+    """
+    Lock files against other processes
+
+    Locks are advisory: they only exclude processes which also use :func:`locked`. They are taken in sorted order, so
+    processes locking several files can't deadlock. Without :mod:`fcntl` (Windows), files are not locked.
+
+    :Basic usage:
+
+    >>> with locked(["doctest_file.toml"]): #doctest: +SKIP
+    ...     atomic_write({"doctest_file.toml": "a = 1\\n"})
+
+    :param typing.Iterable[str] paths: Paths of files to lock
+    :param bool shared: Take a shared lock (for readers) instead of an exclusive lock
+    """
+    if fcntl is None:
+        yield
+        return
+    fds = []
+    try:
+        for path in sorted({os.path.abspath(path) for path in paths}):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o644)
+            fds.append(fd)
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        for fd in reversed(fds):
+            # Closing file releases lock
+            os.close(fd)